@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from emotions import EMOTION_LABELS, score_emotions
+from score_store import get_score_store
+
+# Lines sent to a worker at a time; small enough for steady progress updates
+CHUNK_SIZE = 128
+
+# Finished jobs kept around so revisiting a script shows its arcs straight away
+MAX_FINISHED_JOBS = 8
+
+_pool = None
+_jobs = {}
+_pool_lock = threading.Lock()
+
+
+# Function to set up a worker process so the workers share the CPU instead of oversubscribing it
+def _init_worker(num_threads):
+    os.environ["EMOTION_NUM_THREADS"] = str(num_threads)
+
+
+# Function run inside a worker: score one chunk of lines through the shared score store
+def _score_chunk(texts):
+    return score_emotions(texts, store=get_score_store())
+
+
+# Function to get the process pool shared by every emotion arc job; EMOTION_WORKERS sets its size
+def get_worker_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            cpus = os.cpu_count() or 1
+            workers = int(os.environ.get("EMOTION_WORKERS", min(4, cpus)))
+            # Spawned workers avoid inheriting the server's threads and torch state
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(max(1, cpus // workers),),
+            )
+        return _pool
+
+
+# Background job that scores every dialogue line of a corpus in chunks across the worker pool
+class EmotionArcJob:
+    def __init__(self, corpus, chunk_size=CHUNK_SIZE):
+        self.corpus = corpus
+        self.scores = np.full((corpus.n_lines, len(EMOTION_LABELS)), np.nan, dtype=np.float32)
+        self.scored = np.zeros(corpus.n_lines, dtype=bool)
+        self.errors = []
+        self._lock = threading.Lock()
+        pool = get_worker_pool()
+        self.futures = []
+        for start in range(0, corpus.n_lines, chunk_size):
+            stop = min(start + chunk_size, corpus.n_lines)
+            future = pool.submit(_score_chunk, list(corpus.line_text[start:stop]))
+            future.add_done_callback(lambda future, start=start, stop=stop: self._collect(future, start, stop))
+            self.futures.append(future)
+
+    # Function called as each chunk finishes to copy its scores into place
+    def _collect(self, future, start, stop):
+        with self._lock:
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self.errors.append(error)
+                return
+            self.scores[start:stop] = future.result()
+            self.scored[start:stop] = True
+
+    @property
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+    # Function to get the fraction of lines scored so far
+    def progress(self):
+        with self._lock:
+            return float(self.scored.mean()) if len(self.scored) else 1.0
+
+    # Function to aggregate the lines scored so far into per-scene and per-character emotion arcs
+    def arcs(self):
+        with self._lock:
+            scored = self.scored.copy()
+            scores = self.scores[scored]
+        return aggregate_emotion_arcs(self.corpus, scores, scored)
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+
+
+# Function to average line scores per (character, scene) and per character
+def aggregate_emotion_arcs(corpus, scores, scored):
+    characters = np.asarray(corpus.characters, dtype=object)
+    lines = pd.DataFrame(scores, columns=EMOTION_LABELS)
+    lines["Character"] = characters[corpus.line_speaker[scored]]
+    lines["Scene"] = corpus.line_scene[scored]
+
+    by_scene = lines.groupby(["Character", "Scene"], sort=True)[EMOTION_LABELS].mean().reset_index()
+    by_scene["Scene Name"] = corpus.scene_names[by_scene["Scene"].to_numpy(dtype=np.int64)]
+    by_character = lines.groupby("Character", sort=True)[EMOTION_LABELS].mean()
+    return by_scene, by_character
+
+
+# Function to start the emotion arc job for a corpus, or return the one already running or finished
+def emotion_arc_job(corpus, start=True):
+    with _pool_lock:
+        job = _jobs.get(corpus.key)
+    if job is None and start:
+        job = EmotionArcJob(corpus)
+        with _pool_lock:
+            # Another session may have started the same script in the meantime
+            existing = _jobs.setdefault(corpus.key, job)
+            finished = [key for key, other in _jobs.items() if other.done]
+            for key in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del _jobs[key]
+        if existing is not job:
+            job.cancel()
+            job = existing
+    return job
+
+
+# Function to forget a corpus's job, e.g. to retry one whose chunks failed; scored lines stay in the score store
+def discard_emotion_arc_job(corpus):
+    with _pool_lock:
+        job = _jobs.pop(corpus.key, None)
+    if job is not None:
+        job.cancel()
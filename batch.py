@@ -0,0 +1,130 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from character_stats import character_statistics
+from corpus import open_corpus
+from relationships import RELATIONSHIP_WEIGHTS, top_edges
+from score_store import get_score_store
+from sentiment import compute_character_sentiment, split_by_polarity, token_frequencies
+
+# Output tables, one columnar file each, with a Script column identifying the source file
+TABLES = ["characters", "relationships", "sentiment_words"]
+
+
+# Script files a directory input is expanded to
+SCRIPT_PATTERNS = ["*.csv", "*.parquet"]
+
+
+# Function to expand directories and glob patterns into a sorted list of script paths
+def find_scripts(inputs):
+    paths = set()
+    for item in inputs:
+        patterns = [os.path.join(item, name) for name in SCRIPT_PATTERNS] if os.path.isdir(item) else [item]
+        for pattern in patterns:
+            paths.update(os.path.abspath(path) for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+
+# Function run in a worker process: analyze one screenplay (CSV or columnar Parquet) and return its result tables
+def analyze_script(path, use_cache=True):
+    started = time.perf_counter()
+    corpus = open_corpus(path)
+    store = get_score_store() if use_cache else None
+    script = os.path.relpath(path)
+
+    characters = character_statistics(corpus).copy()
+    sentiment = compute_character_sentiment(corpus, store=store)
+    characters["Sentiment"] = characters["Character"].map(sentiment)
+
+    relationships = []
+    for weight in RELATIONSHIP_WEIGHTS:
+        edges = top_edges(corpus, weight=weight)
+        edges.insert(0, "Weight Type", weight)
+        relationships.append(edges)
+    relationships = pd.concat(relationships, ignore_index=True)
+
+    positive, negative = split_by_polarity(token_frequencies(corpus.line_text))
+    sentiment_words = pd.DataFrame(
+        [(word, count, "positive") for word, count in positive.items()]
+        + [(word, count, "negative") for word, count in negative.items()],
+        columns=["Word", "Count", "Polarity"],
+    )
+
+    tables = {"characters": characters, "relationships": relationships, "sentiment_words": sentiment_words}
+    for table in tables.values():
+        table.insert(0, "Script", script)
+    summary = {
+        "script": script,
+        "path": path,
+        "sha1": corpus.key,
+        "scenes": corpus.n_scenes,
+        "lines": corpus.n_lines,
+        "characters": corpus.n_characters,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    return summary, tables
+
+
+# Function to analyze every script across a process pool and write the combined tables and summary
+def run_batch(paths, output_dir, workers=None, use_cache=True):
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    collected = {name: [] for name in TABLES}
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_script, path, use_cache): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary, tables = future.result()
+            except Exception as error:
+                # One broken script should not cost the rest of the overnight run
+                summaries.append({"script": os.path.relpath(path), "path": path, "error": f"{type(error).__name__}: {error}"})
+                print(f"failed  {path}: {error}")
+                continue
+            summaries.append(summary)
+            for name, table in tables.items():
+                collected[name].append(table)
+            print(f"done    {path} ({summary['seconds']}s)")
+
+    for name, tables in collected.items():
+        if tables:
+            pd.concat(tables, ignore_index=True).to_parquet(os.path.join(output_dir, f"{name}.parquet"), index=False)
+
+    summaries.sort(key=lambda summary: summary["path"])
+    report = {
+        "scripts": len(paths),
+        "failed": sum("error" in summary for summary in summaries),
+        "seconds": round(time.perf_counter() - started, 3),
+        "tables": [f"{name}.parquet" for name, tables in collected.items() if tables],
+        "results": summaries,
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a library of screenplays without the Streamlit UI.")
+    parser.add_argument("inputs", nargs="+", help="CSV or Parquet files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="batch_results", help="directory for the Parquet tables and summary.json")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (defaults to the CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the shared score cache")
+    args = parser.parse_args(argv)
+
+    paths = find_scripts(args.inputs)
+    if not paths:
+        parser.error("no screenplay files matched the given inputs")
+    report = run_batch(paths, args.output, workers=args.workers, use_cache=not args.no_cache)
+    print(f"{report['scripts'] - report['failed']}/{report['scripts']} scripts analyzed in {report['seconds']}s -> {args.output}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
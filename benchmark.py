@@ -0,0 +1,153 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from character_stats import character_statistics
+from corpus import ScriptCorpus
+from deadpool import (analyze_relationships, count_dialogues_for_character, count_scenes_per_character,
+                      perform_sentiment_analysis)
+from graphs import graph_metrics
+from mentions import mention_index
+from relationships import co_occurrence
+from sentiment import compute_character_sentiment, word_polarity
+from synthetic_screenplay import generate_screenplay
+
+# Size tiers, from a feature film up to a TV season
+TIERS = {
+    "small": dict(scenes=100, cast=15),
+    "medium": dict(scenes=2000, cast=80),
+    "large": dict(scenes=20000, cast=400),
+}
+
+# A run slower than the baseline by more than this factor (and by more than REGRESSION_FLOOR seconds) is a regression
+REGRESSION_FACTOR = 1.25
+REGRESSION_FLOOR = 0.01
+
+
+# Function to list (name, callable) pairs; each callable takes the corpus and its source DataFrame
+def benchmarks(include_emotions=False):
+    cases = [
+        ("parse corpus", lambda corpus, df: ScriptCorpus.from_frame(df)),
+        ("character_statistics", lambda corpus, df: character_statistics(corpus)),
+        ("count_scenes_per_character", lambda corpus, df: count_scenes_per_character(corpus)),
+        ("count_dialogues_for_character", lambda corpus, df: count_dialogues_for_character(corpus, corpus.characters[0])),
+        ("analyze_relationships", lambda corpus, df: analyze_relationships(corpus)),
+        ("co_occurrence exchanges", lambda corpus, df: co_occurrence(corpus, "exchanges")),
+        ("co_occurrence words", lambda corpus, df: co_occurrence(corpus, "words")),
+        ("graph_metrics", lambda corpus, df: graph_metrics(corpus)),
+        ("mention_index", lambda corpus, df: mention_index(corpus)),
+        ("perform_sentiment_analysis", lambda corpus, df: perform_sentiment_analysis(corpus.line_text)),
+        ("character_sentiment", lambda corpus, df: compute_character_sentiment(corpus)),
+    ]
+    if include_emotions:
+        from emotions import score_emotions
+
+        cases.append(("emotion inference", lambda corpus, df: score_emotions(corpus.line_text)))
+    return cases
+
+
+# Function to drop results cached on the corpus or in the process so every run recomputes them;
+# loaded resources such as the VADER lexicon stay loaded, since they are not results
+def reset_caches(corpus):
+    corpus.clear_memo()
+    word_polarity.cache_clear()
+
+
+# Function to time a benchmark (best of several warm runs) and measure its peak traced memory in one more run
+def measure(function, corpus, df, repeat):
+    # One untimed run first so lazy imports and resource loading are not counted
+    reset_caches(corpus)
+    function(corpus, df)
+    timings = []
+    for _ in range(repeat):
+        reset_caches(corpus)
+        started = time.perf_counter()
+        function(corpus, df)
+        timings.append(time.perf_counter() - started)
+
+    reset_caches(corpus)
+    tracemalloc.start()
+    try:
+        function(corpus, df)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+# Function to run every benchmark on every requested tier
+def run_benchmarks(tiers, repeat=3, seed=0, include_emotions=False, only=None):
+    results = []
+    for tier in tiers:
+        df = generate_screenplay(seed=seed, **TIERS[tier])
+        corpus = ScriptCorpus.from_frame(df)
+        print(f"{tier}: {corpus.n_scenes} scenes, {corpus.n_lines} lines, {corpus.n_characters} characters")
+        for name, function in benchmarks(include_emotions):
+            if only and name not in only:
+                continue
+            result = {"tier": tier, "benchmark": name, "scenes": corpus.n_scenes, "lines": corpus.n_lines,
+                      "characters": corpus.n_characters}
+            try:
+                seconds, peak = measure(function, corpus, df, repeat)
+            except (LookupError, OSError, ImportError) as error:
+                # Missing NLTK data or model files skip the benchmark instead of failing the suite
+                result["skipped"] = f"{type(error).__name__}: {str(error).strip().splitlines()[0] if str(error).strip() else ''}"
+                print(f"  {name:32s} skipped ({result['skipped']})")
+            else:
+                result.update(seconds=round(seconds, 6), peak_bytes=peak)
+                print(f"  {name:32s} {seconds:9.4f}s  {peak / (1024 * 1024):9.1f} MB")
+            results.append(result)
+    return results
+
+
+# Function to list benchmarks that got slower than the baseline results
+def find_regressions(results, baseline, factor=REGRESSION_FACTOR):
+    previous = {(entry["tier"], entry["benchmark"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry["tier"], entry["benchmark"]))
+        if not before or "seconds" not in entry or "seconds" not in before:
+            continue
+        if entry["seconds"] > before["seconds"] * factor and entry["seconds"] - before["seconds"] > REGRESSION_FLOOR:
+            regressions.append({**entry, "baseline_seconds": before["seconds"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every analysis function on synthetic screenplays.")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--emotions", action="store_true", help="include emotion inference (needs the model)")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results to compare against; regressions exit with status 1")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.tiers, args.repeat, args.seed, args.emotions, args.only)
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "tiers": {tier: TIERS[tier] for tier in args.tiers},
+        "results": results,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            report["regressions"] = find_regressions(results, json.load(handle))
+        for entry in report["regressions"]:
+            print(f"REGRESSION {entry['tier']}/{entry['benchmark']}: {entry['baseline_seconds']}s -> {entry['seconds']}s")
+        status = 1 if report["regressions"] else 0
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"results written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
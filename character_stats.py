@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+STATISTICS_COLUMNS = ["Character", "Scenes", "Lines", "Words", "First Scene", "Last Scene"]
+
+# Metrics that need only the speaker of each line, not its text or the scene headings
+SPEAKER_COLUMNS = ["Character", "Scenes", "Lines"]
+
+
+# Function to get the per-character metrics table, computed once per corpus
+def character_statistics(corpus):
+    return corpus.memo("character_statistics", compute_character_statistics)
+
+
+# Function to get the scene and line counts per character, computed once per corpus from the speakers alone
+def speaker_statistics(corpus):
+    return corpus.memo("speaker_statistics", compute_speaker_statistics)
+
+
+# Function to get the words spoken by each character, computed once per corpus
+def word_counts(corpus):
+    return corpus.memo("word_counts", lambda corpus: np.bincount(
+        corpus.line_speaker, weights=corpus.line_words, minlength=corpus.n_characters
+    ).astype(np.int64))
+
+
+# Function to count scenes and lines per character in one vectorized pass over the line speakers
+def compute_speaker_statistics(corpus):
+    n_characters = corpus.n_characters
+    speakers = corpus.line_speaker
+    if n_characters == 0:
+        return pd.DataFrame(columns=SPEAKER_COLUMNS)
+
+    lines = np.bincount(speakers, minlength=n_characters)
+    # A character is in a scene once, however many lines they speak there
+    scene_speaker = np.unique(corpus.line_scene.astype(np.int64) * n_characters + speakers)
+    scenes = np.bincount(scene_speaker % n_characters, minlength=n_characters)
+    return pd.DataFrame({"Character": corpus.characters, "Scenes": scenes, "Lines": lines})
+
+
+# Function to compute every per-character metric in one vectorized pass over the corpus lines
+def compute_character_statistics(corpus):
+    if corpus.n_characters == 0:
+        return pd.DataFrame(columns=STATISTICS_COLUMNS)
+    speakers = corpus.line_speaker
+
+    # Lines are stored in scene order, so the first and last occurrence give the appearance range
+    _, first_line = np.unique(speakers, return_index=True)
+    _, last_from_end = np.unique(speakers[::-1], return_index=True)
+    first_scene = corpus.line_scene[first_line]
+    last_scene = corpus.line_scene[len(speakers) - 1 - last_from_end]
+
+    stats = speaker_statistics(corpus).copy()
+    stats["Words"] = word_counts(corpus)
+    stats["First Scene"] = corpus.scene_names[first_scene]
+    stats["Last Scene"] = corpus.scene_names[last_scene]
+    return stats[STATISTICS_COLUMNS]
+
+
+# Function to get one metric as a {character: value} dict, largest first
+def statistic_by_character(corpus, column):
+    # Scene and line counts skip the full table so they never load dialogue text or scene headings
+    table = speaker_statistics(corpus) if column in SPEAKER_COLUMNS else character_statistics(corpus)
+    stats = table.sort_values(column, ascending=False, kind="stable")
+    return dict(zip(stats["Character"], stats[column].astype(int)))
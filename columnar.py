@@ -0,0 +1,166 @@
+import argparse
+import glob
+import os
+import threading
+from functools import cached_property
+
+import numpy as np
+
+from corpus import ScriptCorpus, content_hash, read_screenplay_csv
+from resources import lazy_import
+
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+# One row per scene; speakers and dialogue are list columns, i.e. flat line arrays plus scene offsets
+COLUMNAR_COLUMNS = ["scene_name", "scene_action", "speakers", "dialogue"]
+
+# Written into the file metadata so readers can reject files from an incompatible layout
+FORMAT_KEY = b"screenplay_format"
+FORMAT_VERSION = b"1"
+
+
+# Function to build the Arrow table for a corpus; speaker names are dictionary-encoded against the cast list
+def corpus_table(corpus):
+    offsets = pa.array(corpus.scene_offsets.astype(np.int32))
+    speakers = pa.DictionaryArray.from_arrays(
+        pa.array(corpus.line_speaker.astype(np.int32)), pa.array(list(corpus.characters), type=pa.string())
+    )
+    table = pa.table({
+        "scene_name": pa.array(list(corpus.scene_names), type=pa.string()),
+        "scene_action": pa.array(list(corpus.scene_actions), type=pa.string()),
+        "speakers": pa.ListArray.from_arrays(offsets, speakers),
+        "dialogue": pa.ListArray.from_arrays(offsets, pa.array(list(corpus.line_text), type=pa.string())),
+    })
+    return table.replace_schema_metadata({FORMAT_KEY: FORMAT_VERSION})
+
+
+# Function to write a corpus in the columnar format to a path or binary file object
+def write_columnar(corpus, destination):
+    table = corpus_table(corpus)
+    # A single row group: nested dictionary columns can only be read back whole from one
+    pq.write_table(table, destination, compression="zstd", row_group_size=max(1, table.num_rows))
+    return table.num_rows
+
+
+# Function to rebuild a scene's full text from its action and dialogue, in place of the stored Contents column
+def reconstruct_contents(action, speakers, dialogue):
+    return " ".join([action] + [f"{speaker} {line}" for speaker, line in zip(speakers, dialogue)])
+
+
+# Screenplay corpus backed by a columnar Parquet file; each column is read the first time it is used
+class ColumnarCorpus(ScriptCorpus):
+    def __init__(self, source, key=None):
+        # source is the file's bytes or a path; paths are memory-mapped
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._file = pq.ParquetFile(pa.BufferReader(source))
+        else:
+            self._file = pq.ParquetFile(source, memory_map=True)
+        metadata = self._file.schema_arrow.metadata or {}
+        if metadata.get(FORMAT_KEY) != FORMAT_VERSION:
+            raise ValueError("Parquet file is not in the columnar screenplay format")
+        missing = [column for column in COLUMNAR_COLUMNS if column not in self._file.schema_arrow.names]
+        if missing:
+            raise ValueError(f"Parquet file is missing required columns: {', '.join(missing)}")
+        self.key = key
+        self._n_scenes = self._file.metadata.num_rows
+        self._read_lock = threading.Lock()
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+
+    # Function to read one column from the file as a single contiguous array
+    def read_column(self, name):
+        with self._read_lock:
+            column = self._file.read(columns=[name]).column(name)
+        return column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+
+    @cached_property
+    def scene_names(self):
+        return self.read_column("scene_name").to_numpy(zero_copy_only=False).astype(object)
+
+    @cached_property
+    def scene_actions(self):
+        return self.read_column("scene_action").to_numpy(zero_copy_only=False).astype(object)
+
+    @cached_property
+    def _speaker_columns(self):
+        speakers = self.read_column("speakers")
+        offsets = speakers.offsets.to_numpy().astype(np.int64)
+        ids = speakers.flatten()
+        line_scene = np.repeat(np.arange(self._n_scenes, dtype=np.int32), np.diff(offsets))
+        return ids.dictionary.to_pylist(), line_scene, ids.indices.to_numpy().astype(np.int32), offsets
+
+    @property
+    def characters(self):
+        return self._speaker_columns[0]
+
+    @property
+    def line_scene(self):
+        return self._speaker_columns[1]
+
+    @property
+    def line_speaker(self):
+        return self._speaker_columns[2]
+
+    # The list offsets of the speakers column are the scene offsets, no search needed
+    @property
+    def scene_offsets(self):
+        return self._speaker_columns[3]
+
+    @cached_property
+    def line_text(self):
+        return self.read_column("dialogue").flatten().to_numpy(zero_copy_only=False).astype(object)
+
+    @cached_property
+    def contents(self):
+        contents = np.empty(self.n_scenes, dtype=object)
+        for scene in range(self.n_scenes):
+            lines = self.scene_lines(scene)
+            speakers = [self.characters[speaker] for speaker in self.line_speaker[lines]]
+            contents[scene] = reconstruct_contents(self.scene_actions[scene], speakers, self.line_text[lines])
+        return contents
+
+    @property
+    def n_scenes(self):
+        return self._n_scenes
+
+
+# Function to convert one screenplay CSV into the columnar format
+def convert_csv(path, output):
+    with open(path, "rb") as handle:
+        data = handle.read()
+    corpus = ScriptCorpus.from_frame(read_screenplay_csv(data), key=content_hash(data))
+    return write_columnar(corpus, output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert screenplay CSVs into the compact columnar Parquet format.")
+    parser.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    parser.add_argument("-o", "--output", help="Parquet file, or a directory for one file per script (default: next to each CSV)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for pattern in args.inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.csv")
+        paths.extend(sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)))
+    if not paths:
+        parser.error("no screenplay CSVs matched the given inputs")
+    single_file = args.output and args.output.lower().endswith(".parquet")
+    if single_file and len(paths) > 1:
+        parser.error("several CSVs matched; pass a directory as the output")
+
+    for path in paths:
+        if single_file:
+            target = args.output
+        else:
+            directory = args.output or os.path.dirname(path)
+            os.makedirs(directory or ".", exist_ok=True)
+            target = os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + ".parquet")
+        scenes = convert_csv(path, target)
+        print(f"{target}: {scenes} scenes, {os.path.getsize(path)} -> {os.path.getsize(target)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
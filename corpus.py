@@ -0,0 +1,200 @@
+import ast
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# Columns every screenplay CSV is expected to carry
+SCREENPLAY_COLUMNS = ["Scene_Names", "Scene_action", "Scene_Characters", "Scene_Dialogue", "Contents"]
+
+# Every Parquet file starts with these bytes, which is how the columnar format is told apart from CSV
+PARQUET_MAGIC = b"PAR1"
+
+# How many parsed scripts are kept in memory at once
+CORPUS_CACHE_SIZE = 8
+
+_corpus_cache = OrderedDict()
+_corpus_cache_lock = threading.Lock()
+
+
+# Function to turn a stringified Python list cell into a real list of strings
+def parse_list_cell(cell):
+    if not isinstance(cell, str) or not cell.strip():
+        return []
+    try:
+        value = ast.literal_eval(cell)
+    except (ValueError, SyntaxError):
+        # Fall back to a plain comma split for hand-edited cells
+        return [part.strip().strip("'\"") for part in cell.strip("[]").split(",") if part.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value]
+    return [str(value).strip()]
+
+
+# Function to compute the cache key for an uploaded file
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+# Columnar view of a screenplay: scenes, interned characters and one row per spoken line
+class ScriptCorpus:
+    def __init__(self, key, scene_names, scene_actions, contents, characters,
+                 line_scene, line_speaker, line_text):
+        self.key = key
+        self.scene_names = scene_names
+        self.scene_actions = scene_actions
+        self.contents = contents
+        # characters[i] is the name behind speaker id i
+        self.characters = characters
+        self.line_scene = line_scene
+        self.line_speaker = line_speaker
+        self.line_text = line_text
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+
+    @cached_property
+    def character_ids(self):
+        return {name: i for i, name in enumerate(self.characters)}
+
+    @cached_property
+    def line_words(self):
+        return np.fromiter((len(text.split()) for text in self.line_text), dtype=np.int32, count=len(self.line_text))
+
+    # Lines of scene s live in line_*[scene_offsets[s]:scene_offsets[s + 1]]
+    @cached_property
+    def scene_offsets(self):
+        return np.searchsorted(self.line_scene, np.arange(self.n_scenes + 1)).astype(np.int64)
+
+    @classmethod
+    def from_frame(cls, df, key=None):
+        missing = [column for column in SCREENPLAY_COLUMNS if column not in df.columns]
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+        character_ids = {}
+        line_scene = []
+        line_speaker = []
+        line_text = []
+        for scene, (speakers, dialogue) in enumerate(zip(df["Scene_Characters"], df["Scene_Dialogue"])):
+            # Speakers and dialogue are aligned one to one; extra entries on either side are dropped
+            for speaker, text in zip(parse_list_cell(speakers), parse_list_cell(dialogue)):
+                line_scene.append(scene)
+                line_speaker.append(character_ids.setdefault(speaker, len(character_ids)))
+                line_text.append(text)
+
+        return cls(
+            key=key,
+            scene_names=df["Scene_Names"].fillna("").astype(str).to_numpy(dtype=object),
+            scene_actions=df["Scene_action"].fillna("").astype(str).to_numpy(dtype=object),
+            contents=df["Contents"].fillna("").astype(str).to_numpy(dtype=object),
+            characters=list(character_ids),
+            line_scene=np.asarray(line_scene, dtype=np.int32),
+            line_speaker=np.asarray(line_speaker, dtype=np.int32),
+            line_text=np.asarray(line_text, dtype=object),
+        )
+
+    @property
+    def n_scenes(self):
+        return len(self.scene_names)
+
+    @property
+    def n_characters(self):
+        return len(self.characters)
+
+    @property
+    def n_lines(self):
+        return len(self.line_speaker)
+
+    # Function to get the slice of line rows that belong to one scene
+    def scene_lines(self, scene):
+        return slice(int(self.scene_offsets[scene]), int(self.scene_offsets[scene + 1]))
+
+    # Function to get the distinct speaker ids of one scene, in order of first line
+    def scene_cast(self, scene):
+        speakers = self.line_speaker[self.scene_lines(scene)]
+        _, first = np.unique(speakers, return_index=True)
+        return speakers[np.sort(first)]
+
+    # Function to compute a derived result once per corpus and reuse it on later reruns
+    def memo(self, name, compute):
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = compute(self)
+            return self._derived[name]
+
+    # Function to keep only the result for the latest key, e.g. an input the user keeps editing, replacing the previous one
+    def memo_latest(self, name, key, compute):
+        with self._derived_lock:
+            cached = self._derived.get(name)
+            if cached is None or cached[0] != key:
+                cached = self._derived[name] = (key, compute(self))
+            return cached[1]
+
+    # Function to drop every memoized result and lazily derived array, e.g. before timing a fresh computation
+    def clear_memo(self):
+        with self._derived_lock:
+            self._derived.clear()
+            for name in ("character_ids", "line_words", "scene_offsets"):
+                self.__dict__.pop(name, None)
+
+
+# Function to read raw CSV bytes into a DataFrame
+def read_screenplay_csv(data):
+    return pd.read_csv(io.BytesIO(data))
+
+
+# Function to parse raw file bytes, either a screenplay CSV or the columnar Parquet format
+def parse_corpus(data, key=None):
+    key = key or content_hash(data)
+    if data[:4] == PARQUET_MAGIC:
+        # Imported here because the columnar module builds on ScriptCorpus
+        from columnar import ColumnarCorpus
+
+        return ColumnarCorpus(data, key=key)
+    return ScriptCorpus.from_frame(read_screenplay_csv(data), key=key)
+
+
+# Function to open a screenplay file; columnar files are memory-mapped instead of read into memory
+def open_corpus(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        magic = handle.read(4)
+        if magic != PARQUET_MAGIC:
+            data = magic + handle.read()
+            return parse_corpus(data)
+        digest.update(magic)
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    from columnar import ColumnarCorpus
+
+    return ColumnarCorpus(path, key=digest.hexdigest())
+
+
+# Function to load a screenplay corpus, reusing the cached one when the file content is unchanged
+def load_corpus(source):
+    data = source.getvalue() if hasattr(source, "getvalue") else source
+    key = content_hash(data)
+    with _corpus_cache_lock:
+        corpus = _corpus_cache.get(key)
+        if corpus is not None:
+            _corpus_cache.move_to_end(key)
+            return corpus
+
+    corpus = parse_corpus(data, key=key)
+
+    with _corpus_cache_lock:
+        _corpus_cache[key] = corpus
+        _corpus_cache.move_to_end(key)
+        while len(_corpus_cache) > CORPUS_CACHE_SIZE:
+            _corpus_cache.popitem(last=False)
+    return corpus
+
+
+# Function to drop every cached corpus
+def clear_corpus_cache():
+    with _corpus_cache_lock:
+        _corpus_cache.clear()
@@ -1,52 +1,56 @@
-
+import time
+_import_started = time.perf_counter()
 import pandas as pd
-import re
-import nltk
-nltk.download('vader_lexicon')
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 import numpy as np
-nltk.download('punkt')
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-import networkx as nx
 import tempfile
 import os
-from transformers import pipeline
+import uuid
+from resources import RESOURCE_DIR, lazy_import, record, startup_report
+from profiling import MAX_SPANS, Profiler, export_spans, span, spans_to_jsonl
+from corpus import load_corpus
+from emotions import EMOTION_LABELS, score_emotions
+from arcs import discard_emotion_arc_job, emotion_arc_job
+from score_store import get_score_store
+from sentiment import compute_character_sentiment, split_by_polarity, token_frequencies
+from mentions import mention_index, parse_aliases
+from character_stats import character_statistics, statistic_by_character
+from relationships import RELATIONSHIP_WEIGHTS, top_edges
+from revisions import RevisionTracker
+from graphs import DEFAULT_MAX_EDGES, build_relationship_graph, graph_layout, graph_metrics, relationship_figure
+
+# Heavy libraries load the first time a page uses them
+wordcloud = lazy_import("wordcloud")
+go = lazy_import("plotly.graph_objects")
+px = lazy_import("plotly.express")
+record("import app modules", time.perf_counter() - _import_started)
 
 # Function to perform sentiment analysis on dialogues
 def perform_sentiment_analysis(dialogues):
-    # Tokenize the dialogues
-    tokens = word_tokenize(dialogues)
-   
-    # Perform sentiment analysis using Vader
-    sid = SentimentIntensityAnalyzer()
-    sentiments = [sid.polarity_scores(word)['compound'] for word in tokens]
-   
-    # Combine words and sentiments
-    word_sentiments = list(zip(tokens, sentiments))
-   
-    # Separate positive and negative words
-    positive_words = [word for word, sentiment in word_sentiments if sentiment > 0]
-    negative_words = [word for word, sentiment in word_sentiments if sentiment < 0]
-   
-    return positive_words, negative_words
+    # Count each word once, then score only the distinct words
+    frequencies = token_frequencies(dialogues)
+    # Separate positive and negative words, keeping how often each one is said
+    return split_by_polarity(frequencies)
 
-# Function to generate word cloud
-def generate_word_cloud(words1, words2, title1, title2):
-    # Join words into a single string
-    text1 = ' '.join(words1)
-    text2 = ' '.join(words2)
-   
-    # Create two word clouds
-    wordcloud1 = WordCloud(width=500, height=300, background_color="white", colormap='hsv_r')
-    wordcloud1.generate_from_text(text1)
+# Function to get the positive and negative word frequencies, computed once per corpus
+def sentiment_words(corpus):
+    return corpus.memo("sentiment_words", lambda corpus: perform_sentiment_analysis(corpus.line_text))
 
-    wordcloud2 = WordCloud(width=500, height=300, background_color="black", colormap='hsv_r')
-    wordcloud2.generate_from_text(text2)
+# Function to generate word cloud
+def generate_word_cloud(frequencies1, frequencies2, title1, title2):
+    # Leave out the same common words the text-based word cloud skipped
+    frequencies1 = {word: count for word, count in frequencies1.items() if word not in wordcloud.STOPWORDS}
+    frequencies2 = {word: count for word, count in frequencies2.items() if word not in wordcloud.STOPWORDS}
+    if not frequencies1 or not frequencies2:
+        st.info("Not enough positive and negative words in the dialogue to draw the word clouds.")
+        return
+
+    # Create two word clouds straight from the word counts
+    wordcloud1 = wordcloud.WordCloud(width=500, height=300, background_color="white", colormap='hsv_r')
+    wordcloud1.generate_from_frequencies(frequencies1)
+
+    wordcloud2 = wordcloud.WordCloud(width=500, height=300, background_color="black", colormap='hsv_r')
+    wordcloud2.generate_from_frequencies(frequencies2)
    
     # Display the word clouds side by side
     col1, col2 = st.columns(2)
@@ -56,75 +60,86 @@ def generate_word_cloud(words1, words2, title1, title2):
         st.image(wordcloud2.to_array(), caption=title2, use_column_width=True)
 
 # Function to count dialogues for a specific character
-def count_dialogues_for_character(df, character_name):
-    dialogues_count = 0
-
-    # Iterate through each row in the DataFrame
-    for index, row in df.iterrows():
-        scene_dialogues = row["Scene_Dialogue"]
-        if pd.notnull(scene_dialogues):
-            # Use regular expression to find character names in dialogues
-            character_dialogues = re.findall(r"\b" + re.escape(character_name) + r"\b", scene_dialogues, flags=re.IGNORECASE)
-            dialogues_count += len(character_dialogues)
-
-    return dialogues_count
+def count_dialogues_for_character(corpus, character_name, aliases=None):
+    # Looked up in the mention index, which is built in a single pass per corpus
+    return mention_index(corpus, aliases).count(character_name, dialogue_only=True)
 
 # Function to count scenes for a specific character
-def count_scenes_for_character(df, character_name):
-    scenes_count = 0
-
-    # Iterate through each row in the DataFrame
-    for index, row in df.iterrows():
-        scene_characters = row["Scene_Characters"]
-        if pd.notnull(scene_characters):
-            # Use regular expression to find character names in scene characters
-            if re.search(r"\b" + re.escape(character_name) + r"\b", scene_characters, flags=re.IGNORECASE):
-                scenes_count += 1
-
-    return scenes_count
+def count_scenes_for_character(corpus, character_name):
+    scenes_count = count_scenes_per_character(corpus)
+    for character, count in scenes_count.items():
+        if character.lower() == character_name.lower():
+            return count
+    return 0
 
 # Function to analyze character relationships
-def analyze_relationships(df):
-    relationships = {}
-
-    # Iterate through each row in the DataFrame
-    for index, row in df.iterrows():
-        scene_characters = row["Scene_Characters"]
-        if pd.notnull(scene_characters):
-            # Split the scene_characters into a list of characters
-            characters = [character.strip() for character in scene_characters.split(",")]
-            # Update relationships dictionary
-            for character1 in characters:
-                for character2 in characters:
-                    if character1 != character2:
-                        key = (character1, character2)
-                        # Increment the interaction count between character1 and character2
-                        if key not in relationships:
-                            relationships[key] = 1
-                        else:
-                            relationships[key] += 1
-
-    return relationships
+def analyze_relationships(corpus, weight="scenes"):
+    # Each unordered pair appears once, strongest first
+    edges = top_edges(corpus, weight=weight)
+    return {(character1, character2): count for character1, character2, count in edges.itertuples(index=False)}
 
 # Function to count scenes for each character
-def count_scenes_per_character(df):
-    scenes_count = {}
+def count_scenes_per_character(corpus):
+    return statistic_by_character(corpus, "Scenes")
+
+# Function to count speaking lines for each character
+def count_lines_per_character(corpus):
+    return statistic_by_character(corpus, "Lines")
 
-    # Iterate through each row in the DataFrame
-    for index, row in df.iterrows():
-        scene_characters = row["Scene_Characters"]
-        if pd.notnull(scene_characters):
-            # Split the scene_characters into a list of characters
-            characters = [character.strip() for character in scene_characters.split(",")]
-            # Update the scenes count for each character
-            for character in characters:
-                scenes_count[character] = scenes_count.get(character, 0) + 1
 
-    return scenes_count
+# Function to point the user at the provisioning step when NLTK data or the emotion model is missing
+def missing_resources_error():
+    st.error(f"Language resources are missing from {RESOURCE_DIR}. Run `python resources.py` once to download them, then reload the page.")
 
+# Function to get each character's average sentiment, computed once per corpus
+def character_sentiment(corpus):
+    return corpus.memo("character_sentiment", lambda corpus: compute_character_sentiment(corpus, store=get_score_store()))
+
+# Function to render the relationship graph controls and return the pruned graph with its layout
+def relationship_graph_controls(corpus):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        weight = st.selectbox("Weight relationships by", list(RELATIONSHIP_WEIGHTS), format_func=RELATIONSHIP_WEIGHTS.get)
+    with col2:
+        max_edges = st.number_input("Strongest relationships to draw", min_value=1, value=DEFAULT_MAX_EDGES, step=50)
+    with col3:
+        min_weight = st.number_input("Minimum weight", min_value=1, value=1)
+    with span("build graph"):
+        graph = build_relationship_graph(corpus, weight=weight, max_edges=int(max_edges), min_weight=min_weight)
+    # Reuse the last layout for this script as the starting point when the edge set changes
+    with span("graph layout"):
+        positions = graph_layout(graph, warm_start_key=corpus.key)
+    return graph, positions
+
+# Function to get this session's revision tracker, starting a fresh one when the emotion setting changes
+def revision_tracker(emotions):
+    tracker = st.session_state.get("revision_tracker")
+    if tracker is None or tracker.emotions != emotions:
+        tracker = st.session_state["revision_tracker"] = RevisionTracker(store=get_score_store(), emotions=emotions)
+        st.session_state.pop("revision_diff", None)
+    return tracker
+
+# Function to highlight the rows of characters whose numbers moved in the last revision
+def highlight_characters(table, characters):
+    changed = set(characters)
+    return table.style.apply(
+        lambda row: ["background-color: #fff3b0" if row["Character"] in changed else ""] * len(row), axis=1
+    )
 
 def split_text_into_lines(texts):
     return texts.splitlines()
+
+# Function to get the parsed corpus for the uploaded file, shared by every page
+def get_corpus(uploaded_file):
+    if uploaded_file is None:
+        st.info("Upload a CSV or Parquet file containing movie data in the sidebar to use this page.")
+        return None
+    try:
+        with span("load corpus"):
+            return load_corpus(uploaded_file)
+    except ValueError as error:
+        st.error(str(error))
+        return None
     
 # Main Streamlit app
 def main():
@@ -142,9 +157,49 @@ def main():
     st.markdown(html_temp, unsafe_allow_html=True)
 
     st.sidebar.title("Navigation")
-    page_options = ["Home", "Word Cloud", "Character Names", "Character Dialogue Counts", "Character Scene Counts", "Bar Graph on Dialogue Count", "Bar Graph on Scene Count", "Character Interactions", "Character Relationships", "Character Emotion Analysis", "Text Emotion Analysis"]
+    page_options = ["Home", "Word Cloud", "Character Names", "Character Dialogue Counts", "Character Scene Counts", "Bar Graph on Dialogue Count", "Bar Graph on Scene Count", "Character Interactions", "Character Relationships", "Character Emotion Analysis", "Character Emotion Arcs", "Script Revisions", "Text Emotion Analysis"]
     page = st.sidebar.radio("Go to", page_options, index=0, help="Select a page to navigate to")
-
+    # One upload serves every page; the parsed corpus is cached by file content
+    uploaded_file = st.sidebar.file_uploader("Upload a CSV or Parquet file containing movie data", type=["csv", "parquet"])
+    with st.sidebar.expander("Startup report"):
+        st.dataframe(pd.DataFrame(startup_report(), columns=["Step", "Seconds"]), hide_index=True)
+    with st.sidebar.expander("Performance"):
+        show_panel = st.checkbox("Show timing breakdown for this page")
+        capture_memory = st.checkbox("Capture peak memory (slower)")
+
+    session = st.session_state.setdefault("profiling_session", uuid.uuid4().hex)
+    profiler = Profiler(page, session=session, memory=capture_memory)
+    try:
+        with profiler:
+            with span(f"page: {page}"):
+                render_page(page, uploaded_file)
+    finally:
+        # Also runs when a page ends its run early with st.experimental_rerun, e.g. while polling a job
+        # Spans accumulate per session until they are exported
+        spans = st.session_state.setdefault("profiling_spans", [])
+        spans.extend(profiler.breakdown())
+        del spans[:-MAX_SPANS]
+        if show_panel:
+            render_performance_panel(profiler, spans)
+
+# Function to show the timing breakdown of the current rerun in the sidebar
+def render_performance_panel(profiler, spans):
+    with st.sidebar.expander("Timing breakdown", expanded=True):
+        rows = [{
+            "Stage": "\u2003" * record["depth"] + record["span"],
+            "Seconds": record["seconds"],
+            "Peak MB": None if record["peak_bytes"] is None else record["peak_bytes"] / (1024 * 1024),
+        } for record in profiler.breakdown()]
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        st.caption(f"Rerun total: {profiler.total:.3f}s, {len(spans)} spans recorded this session")
+        st.download_button("Download spans (JSON lines)", spans_to_jsonl(spans), file_name="spans.jsonl")
+        if st.button("Export spans to file"):
+            path = export_spans(spans)
+            spans.clear()
+            st.success(f"Spans appended to {path}")
+
+# Function to render the selected page
+def render_page(page, uploaded_file):
     if page == "Home":
         st.write("""
             🙏🏻Welcome to the Movie Character Analysis App!
@@ -174,62 +229,55 @@ def main():
    
     elif page == "Word Cloud":
         st.subheader("WordCloud for Positive 😌 and Negative Words 😱")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
-            all_dialogues = ' '.join(df['Scene_Dialogue'].dropna())
-            positive_words, negative_words = perform_sentiment_analysis(all_dialogues)
-            generate_word_cloud(positive_words, negative_words, "✅Positive Words", "🤬Negative Words")
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            try:
+                with span("sentiment analysis"):
+                    positive_words, negative_words = sentiment_words(corpus)
+            except LookupError:
+                missing_resources_error()
+            else:
+                with span("render word clouds"):
+                    generate_word_cloud(positive_words, negative_words, "✅Positive Words", "🤬Negative Words")
 
     elif page == "Character Names":
         st.subheader("Character Names 😏")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
-            character_names = set()
-            for scene_characters in df["Scene_Characters"]:
-                if pd.notnull(scene_characters):
-                    names = re.findall(r"\b[A-Z][a-zA-Z\s]+\b", scene_characters)
-                    character_names.update(names)
-            character_names = list(character_names)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            character_names = list(corpus.characters)
             st.write("Character Names:", character_names)
+            # Aliases fold nicknames into one character, e.g. "DEADPOOL: Wade, Pool"
+            alias_text = st.text_area("Character aliases (one per line, NAME: alias, alias)", placeholder="DEADPOOL: Wade, Pool, Wade Wilson")
+            with span("mention index"):
+                index = mention_index(corpus, parse_aliases(alias_text))
+            st.write("Mentions of each character in dialogue and action:")
+            st.dataframe(index.summary(), hide_index=True, use_container_width=True)
+            st.write("Who talks about whom:")
+            st.dataframe(index.talks_about(), hide_index=True, use_container_width=True)
 
     elif page == "Character Dialogue Counts":
         st.subheader("Character Dialogue Analysis 🗣")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
             # Dictionary to store the dialogue counts for each character
-            character_dialogue_counts = {}
-            # Iterate through the DataFrame and count the dialogues for each character
-            for index, row in df.iterrows():
-                characters = row['Scene_Characters']
-                if pd.notnull(characters):
-                    characters = characters.split(", ")
-                    for character in characters:
-                        character_name = character.strip("[]")
-                        if character_name in character_dialogue_counts:
-                            character_dialogue_counts[character_name] += 1
-                        else:
-                            character_dialogue_counts[character_name] = 1
+            with span("character statistics"):
+                character_dialogue_counts = count_lines_per_character(corpus)
             # Display the dialogue counts for each character
             st.write("Number of dialogues for each character:")
             for character, count in character_dialogue_counts.items():
                 st.write(f"{character}: {count} dialogues")
+            # Full per-character breakdown
+            st.write("Character statistics:")
+            st.dataframe(character_statistics(corpus), hide_index=True)
 
                         
     elif page == "Character Scene Counts":
         st.subheader("Character Scene Analysis 🎞")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
             # Calculate the number of scenes for each character
-            character_scenes_count = count_scenes_per_character(df)
-            # Sum up the counts for each character
-            total_scenes_count = {}
-            for character, count in character_scenes_count.items():
-                character_name = character.strip("[]")  # Remove brackets from character name
-                total_scenes_count[character_name] = total_scenes_count.get(character_name, 0) + count
+            with span("character statistics"):
+                total_scenes_count = count_scenes_per_character(corpus)
             # Display the total number of scenes for each character
             st.write("Total Scenes Count for Each Character:")
             for character, count in total_scenes_count.items():
@@ -238,21 +286,10 @@ def main():
 
     elif page == "Bar Graph on Dialogue Count":
         st.subheader("Dialogue Counts for Each Character")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
-            character_dialogue_counts = {}
-            # Iterate through the DataFrame and count the dialogues for each character
-            for index, row in df.iterrows():
-                characters = row['Scene_Characters']
-                if pd.notnull(characters):
-                    characters = characters.split(", ")
-                    for character in characters:
-                        character_name = character.strip("[]")
-                        if character_name in character_dialogue_counts:
-                            character_dialogue_counts[character_name] += 1
-                        else:
-                            character_dialogue_counts[character_name] = 1
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            with span("character statistics"):
+                character_dialogue_counts = count_lines_per_character(corpus)
             # Convert the dialogue counts dictionary to a DataFrame
             dialogue_counts_df = pd.DataFrame(list(character_dialogue_counts.items()), columns=["Character", "Dialogue Count"])
             # Create a bar graph using Plotly Express
@@ -261,21 +298,17 @@ def main():
             # Add text annotations for each bar
             fig.update_traces(texttemplate='%{y}', textposition='outside')
             # Show the plot
-            st.plotly_chart(fig)
+            with span("render chart"):
+                st.plotly_chart(fig)
 
 
     elif page == "Bar Graph on Scene Count":
         st.subheader("Scene Counts for Each Character")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
             # Calculate the number of scenes for each character
-            character_scenes_count = count_scenes_per_character(df)
-            # Sum up the counts for each character
-            total_scenes_count = {}
-            for character, count in character_scenes_count.items():
-                character_name = character.strip("[]")  # Remove brackets from character name
-                total_scenes_count[character_name] = total_scenes_count.get(character_name, 0) + count
+            with span("character statistics"):
+                total_scenes_count = count_scenes_per_character(corpus)
             # Convert the total scenes count dictionary to a DataFrame
             scenes_counts_df = pd.DataFrame(list(total_scenes_count.items()), columns=["Character", "Scenes Count"])
             # Create a bar graph using Plotly Express
@@ -284,43 +317,139 @@ def main():
             # Add text annotations for each bar
             fig.update_traces(texttemplate='%{y}', textposition='outside')
             # Show the plot
-            st.plotly_chart(fig)
+            with span("render chart"):
+                st.plotly_chart(fig)
 
     elif page == "Character Interactions":
         st.subheader("Character Interactions/Relationships Analysis 🤝🏻")
-        uploaded_file = st.file_uploader("Upload a CSV file containing movie data", type="csv")
-        if uploaded_file is not None:
-            df = pd.read_csv(uploaded_file)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            weight = st.selectbox("Weight interactions by", list(RELATIONSHIP_WEIGHTS), format_func=RELATIONSHIP_WEIGHTS.get)
+            col1, col2 = st.columns(2)
+            with col1:
+                top_k = st.number_input("Strongest relationships to show", min_value=1, value=50, step=10)
+            with col2:
+                min_weight = st.number_input("Minimum weight", min_value=1, value=1)
             # Analyze relationships for all characters
-            character_relationships = analyze_relationships(df)
+            with span("analyze relationships"):
+                character_relationships = top_edges(corpus, weight=weight, k=int(top_k), min_weight=min_weight)
             # Display character interactions
             st.write("Character Relationships:")
-            for characters, count in character_relationships.items():
-                character1, character2 = characters
-                # Remove brackets from character names if present
-                character1 = character1.strip("[]")
-                character2 = character2.strip("[]")
-                st.write(f"{character1} - {character2}: {count} interactions")
+            st.dataframe(character_relationships, hide_index=True, use_container_width=True)
     
 
     elif page == "Character Relationships":
         st.title("Character Relationships Graph")
-        st.write("Below is the graph showing character relationships:")
-        # Path to your PNG file
-        image_path = "deadpool_relationships.png"
-        # Display the image
-        st.image(image_path, use_column_width=True)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            st.write("Below is the graph showing character relationships:")
+            graph, positions = relationship_graph_controls(corpus)
+            with span("graph metrics"):
+                metrics = graph_metrics(corpus)
+            communities = metrics["Community"].to_dict()
+            hover = {
+                character: f"{character}<br>Degree: {row['Degree']}<br>Betweenness: {row['Betweenness']:.3f}<br>Community: {row['Community']}"
+                for character, row in metrics.iterrows()
+            }
+            fig = relationship_figure(graph, positions, communities, node_text=hover, title="Character Relationships")
+            with span("render graph"):
+                st.plotly_chart(fig, use_container_width=True)
+            st.write("Character network metrics:")
+            st.dataframe(metrics.sort_values("Weighted Degree", ascending=False), use_container_width=True)
 
     
     elif page == "Character Emotion Analysis":
         st.title("Character Emotion Graph")
-        st.write("Below is the graph showing character emotion:")
-        # Path to your PNG file
-        image_path = "deadpool_relationships_emotions.png"
-        # Display the image
-        st.image(image_path, use_column_width=True)
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            st.write("Below is the graph showing character emotion:")
+            graph, positions = relationship_graph_controls(corpus)
+            try:
+                with span("character sentiment"):
+                    sentiment = character_sentiment(corpus)
+            except LookupError:
+                missing_resources_error()
+            else:
+                hover = {character: f"{character}<br>Average sentiment: {score:+.3f}" for character, score in sentiment.items()}
+                fig = relationship_figure(graph, positions, sentiment, node_text=hover, colorscale="RdYlGn",
+                                          color_title="Sentiment", color_range=(-1, 1), title="Character Emotions")
+                with span("render graph"):
+                    st.plotly_chart(fig, use_container_width=True)
  
 
+    elif page == "Character Emotion Arcs":
+        st.title("Character Emotion Arcs")
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            job = emotion_arc_job(corpus, start=False)
+            if job is None:
+                st.write(f"Scores all {corpus.n_lines} dialogue lines with the emotion model in the background.")
+                if st.button("Compute emotion arcs"):
+                    job = emotion_arc_job(corpus)
+            if job is not None and job.done and job.errors:
+                st.error(f"Emotion analysis failed for part of the script: {job.errors[0]}")
+                if st.button("Retry"):
+                    # Lines that did get scored come straight back from the score store
+                    discard_emotion_arc_job(corpus)
+                    job = emotion_arc_job(corpus)
+            if job is not None:
+                progress = job.progress()
+                st.progress(progress, text=f"{progress:.0%} of dialogue lines analyzed")
+                with span("aggregate emotion arcs"):
+                    by_scene, by_character = job.arcs()
+                if not by_character.empty:
+                    character = st.selectbox("Character", list(by_character.index))
+                    emotions = st.multiselect("Emotions", EMOTION_LABELS, default=["joy", "anger", "sadness", "fear"])
+                    arc = by_scene[by_scene["Character"] == character]
+                    # Plot the character's average emotion in each scene they speak in
+                    fig = go.Figure()
+                    for emotion in emotions:
+                        fig.add_trace(go.Scatter(x=arc["Scene"], y=arc[emotion], mode='lines+markers', name=emotion,
+                                                 hovertext=arc["Scene Name"]))
+                    fig.update_layout(xaxis_title="Scene", yaxis_title="Score", title=f"Emotion arc for {character}")
+                    st.plotly_chart(fig)
+                    st.write("Average emotions per character:")
+                    st.dataframe(by_character.style.format("{:.3f}"), use_container_width=True)
+                if not job.done:
+                    # Poll for more finished chunks without holding the script thread for the whole run
+                    time.sleep(1)
+                    st.experimental_rerun()
+
+    elif page == "Script Revisions":
+        st.title("Script Revisions")
+        st.write("Upload each new draft in the sidebar. Only scenes whose heading, cast or dialogue changed since the previous draft are re-analyzed.")
+        corpus = get_corpus(uploaded_file)
+        if corpus is not None:
+            emotions = st.checkbox("Include emotion scores (runs the emotion model on changed lines)")
+            tracker = revision_tracker(emotions)
+            if st.button("Start over from this draft"):
+                tracker = st.session_state["revision_tracker"] = RevisionTracker(store=get_score_store(), emotions=emotions)
+                st.session_state.pop("revision_diff", None)
+            if tracker.key != corpus.key:
+                try:
+                    with span("update revision"):
+                        st.session_state["revision_diff"] = tracker.update(corpus)
+                except (OSError, LookupError) as error:
+                    # The totals still describe the previous draft, so uploading again retries this one
+                    st.error(f"Could not score the changed scenes: {error}")
+            diff = st.session_state.get("revision_diff")
+            if diff is not None:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Scenes added or edited", diff.added)
+                col2.metric("Scenes removed or replaced", diff.removed)
+                col3.metric("Scenes unchanged", diff.unchanged)
+                if diff.moved.empty:
+                    st.info("No character's numbers moved since the previous draft.")
+                else:
+                    st.write("Changes since the previous draft:")
+                    st.dataframe(diff.moved.style.format(precision=3), hide_index=True, use_container_width=True)
+            st.write("Characters in this draft (highlighted rows changed):")
+            characters = tracker.character_table()
+            changed = diff.changed_characters if diff is not None else []
+            st.dataframe(highlight_characters(characters, changed).format(precision=3), hide_index=True, use_container_width=True)
+            weight = st.selectbox("Weight relationships by", list(RELATIONSHIP_WEIGHTS), format_func=RELATIONSHIP_WEIGHTS.get)
+            st.dataframe(tracker.edges(weight), hide_index=True, use_container_width=True)
+
     elif page == "Text Emotion Analysis":
         st.title("Text Emotion Analysis")
         # Get user input text
@@ -347,61 +476,22 @@ def main():
             With Ajax dead, Deadpool frees Vanessa and explains why he disappeared. Vanessa, though initially shocked by Wade's appearance, still loves him. The two reconcile and share a kiss, with Wade feeling hopeful about their future together.
 
             The movie ends with Deadpool acknowledging his place as an unconventional anti-hero, breaking the fourth wall to speak directly to the audience. He humorously addresses his journey, the love he has for Vanessa, and his acceptance of his new identity. In a post-credits scene, Deadpool teases the audience with the possibility of a sequel and the introduction of a new character, Cable."""
-            pipe = pipeline("text-classification", model="cardiffnlp/twitter-roberta-base-emotion-multilabel-latest", return_all_scores=True)
-            texts = split_text_into_lines(texts)
-            # Initialize emotion lists
-            anger = []
-            anticipation = []
-            disgust = []
-            fear = []
-            joy = []
-            love = []
-            optimism = []
-            pessimism = []
-            sadness = []
-            surprise = []
-            trust = []
-            # Loop through each line of text and analyze emotions
-            for text in texts:
-                emotions = pipe(text)
-                for feel in emotions[0]:
-                    if feel['label'] == 'anger':
-                        anger.append(feel['score'])
-                    elif feel['label'] == 'anticipation':
-                        anticipation.append(feel['score'])
-                    elif feel['label'] == 'disgust':
-                        disgust.append(feel['score'])
-                    elif feel['label'] == 'fear':
-                        fear.append(feel['score'])
-                    elif feel['label'] == 'joy':
-                        joy.append(feel['score'])
-                    elif feel['label'] == 'love':
-                        love.append(feel['score'])
-                    elif feel['label'] == 'optimism':
-                        optimism.append(feel['score'])
-                    elif feel['label'] == 'pessimism':
-                        pessimism.append(feel['score'])
-                    elif feel['label'] == 'sadness':
-                        sadness.append(feel['score'])
-                    elif feel['label'] == 'surprise':
-                        surprise.append(feel['score'])
-                    elif feel['label'] == 'trust':
-                        trust.append(feel['score'])
-            # Create Plotly figure
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(y=anger, mode='lines', name='anger'))
-            fig.add_trace(go.Scatter(y=anticipation, mode='lines', name='anticipation'))
-            fig.add_trace(go.Scatter(y=disgust, mode='lines', name='disgust'))
-            fig.add_trace(go.Scatter(y=fear, mode='lines', name='fear'))
-            fig.add_trace(go.Scatter(y=joy, mode='lines', name='joy'))
-            fig.add_trace(go.Scatter(y=love, mode='lines', name='love'))
-            fig.add_trace(go.Scatter(y=optimism, mode='lines', name='optimism'))
-            fig.add_trace(go.Scatter(y=pessimism, mode='lines', name='pessimism'))
-            fig.add_trace(go.Scatter(y=sadness, mode='lines', name='sadness'))
-            fig.add_trace(go.Scatter(y=surprise, mode='lines', name='surprise'))
-            fig.add_trace(go.Scatter(y=trust, mode='lines', name='trust'))
-            # Display Plotly figure
-            st.plotly_chart(fig)
+            # Blank lines between paragraphs carry no emotion
+            texts = [text for text in split_text_into_lines(texts) if text.strip()]
+            # Only lines not already in the score store reach the model
+            try:
+                with span("emotion analysis"):
+                    scores = score_emotions(texts, store=get_score_store())
+            except OSError:
+                missing_resources_error()
+            else:
+                # Create Plotly figure
+                fig = go.Figure()
+                for column, emotion in enumerate(EMOTION_LABELS):
+                    fig.add_trace(go.Scatter(y=scores[:, column], mode='lines', name=emotion))
+                # Display Plotly figure
+                with span("render chart"):
+                    st.plotly_chart(fig)
 
 
 # Run the Streamlit app
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from profiling import span
+from resources import lazy_import, model_source
+from score_store import cached_scores
+
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+
+EMOTION_MODEL = "cardiffnlp/twitter-roberta-base-emotion-multilabel-latest"
+
+# Column order of every emotion score matrix
+EMOTION_LABELS = ["anger", "anticipation", "disgust", "fear", "joy", "love", "optimism", "pessimism", "sadness", "surprise", "trust"]
+
+DEFAULT_BATCH_SIZE = 32
+MAX_TOKENS = 512
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# Function to fingerprint a local model snapshot by its config and the names and sizes of its other files
+def snapshot_fingerprint(path):
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if name == "config.json":
+            with open(file_path, "rb") as handle:
+                digest.update(handle.read())
+        elif os.path.isfile(file_path):
+            digest.update(f"\0{name}\0{os.path.getsize(file_path)}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+# Emotion classifier that keeps the model in memory and scores lines in length-sorted batches
+class EmotionEngine:
+    def __init__(self, model_name=EMOTION_MODEL, num_threads=None, batch_size=DEFAULT_BATCH_SIZE):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        # A provisioned local snapshot is used when present; without one only the local Hugging Face cache is tried,
+        # so loading never touches the network and a missing model fails with an OSError
+        source = model_source(model_name)
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(source, local_files_only=True)
+        self.model = transformers.AutoModelForSequenceClassification.from_pretrained(source, local_files_only=True)
+        self.model.eval()
+        self.max_length = min(self.tokenizer.model_max_length, MAX_TOKENS)
+
+        config = self.model.config
+        # Multi-label heads are read through a sigmoid, single-label ones through a softmax
+        self.multi_label = config.problem_type == "multi_label_classification" or config.num_labels == 1
+        # Model output j lands in column label_columns[j] of the score matrix
+        self.label_columns = np.array([EMOTION_LABELS.index(config.id2label[j]) for j in range(config.num_labels)])
+        # Cached scores are only reused for the exact same model weights; snapshots saved locally carry no commit hash
+        revision = getattr(config, "_commit_hash", None)
+        if revision is None and os.path.isdir(source):
+            revision = snapshot_fingerprint(source)
+        self.identity = f"emotion:{model_name}:{revision or 'unknown'}"
+
+    # Function to score lines, returning a (lines x emotions) matrix in input order
+    def score(self, texts, batch_size=None):
+        texts = list(texts)
+        batch_size = batch_size or self.batch_size
+        scores = np.zeros((len(texts), len(EMOTION_LABELS)), dtype=np.float32)
+        # Similar lengths share a batch so padding stays short
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                encoded = self.tokenizer([texts[row] for row in rows], padding=True, truncation=True,
+                                         max_length=self.max_length, return_tensors="pt")
+                logits = self.model(**encoded).logits
+                probabilities = logits.sigmoid() if self.multi_label else logits.softmax(dim=-1)
+                scores[np.ix_(rows, self.label_columns)] = probabilities.numpy()
+        return scores
+
+
+# Function to get the process-wide emotion engine, loading the model on first use
+def get_emotion_engine(num_threads=None):
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            if num_threads is None and os.environ.get("EMOTION_NUM_THREADS"):
+                num_threads = int(os.environ["EMOTION_NUM_THREADS"])
+            with span("load emotion model"):
+                _engine = EmotionEngine(num_threads=num_threads)
+        return _engine
+
+
+# Function to score lines with the shared engine, reusing stored scores for lines seen before
+def score_emotions(texts, store=None):
+    engine = get_emotion_engine()
+
+    def compute(lines):
+        with span(f"emotion inference ({len(lines)} lines)"):
+            return engine.score(lines)
+
+    return cached_scores(store, engine.identity, texts, compute, len(EMOTION_LABELS))
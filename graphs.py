@@ -0,0 +1,152 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from relationships import co_occurrence, top_edges
+from resources import lazy_import
+
+nx = lazy_import("networkx")
+go = lazy_import("plotly.graph_objects")
+
+# Edges kept for drawing; enough for the strongest ties of a large cast while staying fast to render
+DEFAULT_MAX_EDGES = 200
+
+# How many computed layouts are kept in memory at once
+LAYOUT_CACHE_SIZE = 32
+
+LAYOUT_ITERATIONS = 50
+WARM_START_ITERATIONS = 15
+LAYOUT_SEED = 7
+
+METRIC_COLUMNS = ["Degree", "Weighted Degree", "Betweenness", "Eigenvector", "Community"]
+
+_layout_cache = OrderedDict()
+# Last layout drawn for each corpus, used as the starting point when its edge set changes
+_last_positions = {}
+_layout_lock = threading.Lock()
+
+
+# Function to build a weighted relationship graph from the strongest pruned edges
+def build_relationship_graph(corpus, weight="scenes", max_edges=DEFAULT_MAX_EDGES, min_weight=1):
+    edges = top_edges(corpus, weight=weight, k=max_edges, min_weight=min_weight)
+    graph = nx.Graph()
+    for character1, character2, value in edges.itertuples(index=False):
+        graph.add_edge(character1, character2, weight=float(value))
+    return graph
+
+
+# Function to fingerprint a graph by its nodes and weighted edges
+def graph_hash(graph):
+    digest = hashlib.sha1()
+    for node in sorted(graph.nodes):
+        digest.update(f"n:{node}\n".encode("utf-8"))
+    for character1, character2, value in sorted((min(u, v), max(u, v), w) for u, v, w in graph.edges(data="weight")):
+        digest.update(f"e:{character1}\t{character2}\t{value}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Function to get a force-directed layout, cached by graph hash and warm-started from the previous one
+def graph_layout(graph, warm_start_key=None):
+    key = graph_hash(graph)
+    with _layout_lock:
+        positions = _layout_cache.get(key)
+        if positions is not None:
+            _layout_cache.move_to_end(key)
+            if warm_start_key is not None:
+                _last_positions[warm_start_key] = positions
+            return positions
+        previous = _last_positions.get(warm_start_key) if warm_start_key is not None else None
+
+    if graph.number_of_nodes() == 0:
+        positions = {}
+    else:
+        initial = None
+        iterations = LAYOUT_ITERATIONS
+        if previous:
+            # Nodes missing from the previous layout start at random positions
+            initial = {node: previous[node] for node in graph.nodes if node in previous} or None
+            if initial is not None:
+                iterations = WARM_START_ITERATIONS
+        positions = nx.spring_layout(graph, pos=initial, iterations=iterations, weight="weight", seed=LAYOUT_SEED)
+
+    with _layout_lock:
+        _layout_cache[key] = positions
+        while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+        if warm_start_key is not None:
+            _last_positions[warm_start_key] = positions
+    return positions
+
+
+# Function to compute degree, centrality and community metrics on the full shared-scene graph
+def compute_graph_metrics(corpus):
+    matrix = co_occurrence(corpus, "scenes")
+    graph = nx.from_scipy_sparse_array(matrix)
+    graph = nx.relabel_nodes(graph, dict(enumerate(corpus.characters)))
+    metrics = pd.DataFrame(index=pd.Index(corpus.characters, name="Character"), columns=METRIC_COLUMNS)
+    if graph.number_of_nodes() == 0:
+        return metrics
+
+    metrics["Degree"] = pd.Series(dict(graph.degree()))
+    metrics["Weighted Degree"] = pd.Series(dict(graph.degree(weight="weight")))
+    metrics["Betweenness"] = pd.Series(nx.betweenness_centrality(graph))
+    try:
+        # Power iteration copes with the disconnected casts that the numpy solver rejects
+        metrics["Eigenvector"] = pd.Series(nx.eigenvector_centrality(graph, weight="weight", max_iter=1000))
+    except nx.PowerIterationFailedConvergence:
+        metrics["Eigenvector"] = 0.0
+    communities = nx.community.louvain_communities(graph, weight="weight", seed=LAYOUT_SEED)
+    metrics["Community"] = pd.Series({node: number for number, members in enumerate(communities) for node in members})
+    return metrics
+
+
+# Function to get the graph metrics, computed once per corpus
+def graph_metrics(corpus):
+    return corpus.memo("graph_metrics", compute_graph_metrics)
+
+
+# Function to draw a relationship graph as an interactive Plotly figure
+def relationship_figure(graph, positions, node_color, node_text=None, colorscale=None, color_title=None,
+                        color_range=None, title=None):
+    edge_x = []
+    edge_y = []
+    for character1, character2 in graph.edges:
+        x0, y0 = positions[character1]
+        x1, y1 = positions[character2]
+        # None breaks the line so every edge fits in a single trace
+        edge_x.extend((x0, x1, None))
+        edge_y.extend((y0, y1, None))
+
+    nodes = list(graph.nodes)
+    strength = np.array([graph.degree(node, weight="weight") for node in nodes], dtype=float)
+    sizes = 12 + 28 * np.sqrt(strength / strength.max()) if len(nodes) and strength.max() > 0 else 12
+
+    marker = dict(size=sizes, color=[node_color.get(node, 0) for node in nodes], line=dict(width=1, color="white"))
+    if colorscale is not None:
+        marker.update(colorscale=colorscale, showscale=True, colorbar=dict(title=color_title))
+    if color_range is not None:
+        marker.update(cmin=color_range[0], cmax=color_range[1])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=edge_x, y=edge_y, mode="lines", line=dict(width=0.7, color="#999"), hoverinfo="none"))
+    fig.add_trace(go.Scatter(
+        x=[positions[node][0] for node in nodes],
+        y=[positions[node][1] for node in nodes],
+        mode="markers+text",
+        text=nodes,
+        textposition="top center",
+        hovertext=[node_text.get(node, node) for node in nodes] if node_text else nodes,
+        hoverinfo="text",
+        marker=marker,
+    ))
+    fig.update_layout(
+        title=title,
+        showlegend=False,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        margin=dict(l=10, r=10, t=40, b=10),
+    )
+    return fig
@@ -0,0 +1,219 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from resources import lazy_import
+
+nx = lazy_import("networkx")
+
+# Where a mention was found
+DIALOGUE = 0
+ACTION = 1
+
+
+# Aho-Corasick automaton that finds every occurrence of many phrases in one scan of a text
+class PhraseMatcher:
+    def __init__(self, phrases):
+        # phrases: {lowercase phrase: value}; the value is reported with each match
+        self.values = []
+        self.lengths = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for phrase, value in phrases.items():
+            state = 0
+            for char in phrase:
+                following = self.goto[state].get(char)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[state][char] = following
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = following
+            self.output[state].append(len(self.values))
+            self.values.append(value)
+            self.lengths.append(len(phrase))
+
+        # Breadth-first pass wiring each state's failure link to its longest proper suffix state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                # Children of the root fall back to the root itself
+                self.fail[following] = target if target != following else 0
+                self.output[following] = self.output[following] + self.output[self.fail[following]]
+
+    # Function to find whole-word matches as (start, end, value), longest first where they overlap
+    def find(self, text):
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Keep offsets aligned with the original text when lowercasing changes its length
+            lowered = "".join(char.lower() if len(char.lower()) == 1 else char for char in text)
+        goto, fail, output, lengths = self.goto, self.fail, self.output, self.lengths
+        matches = []
+        state = 0
+        for end, char in enumerate(lowered, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for phrase in output[state]:
+                start = end - lengths[phrase]
+                if (start == 0 or not lowered[start - 1].isalnum()) and (end == len(lowered) or not lowered[end].isalnum()):
+                    matches.append((start, end, phrase))
+
+        # Leftmost-longest: "Wade Wilson" wins over the "Wade" inside it
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        found = []
+        covered = 0
+        for start, end, phrase in matches:
+            if start >= covered:
+                found.append((start, end, self.values[phrase]))
+                covered = end
+        return found
+
+
+# Function to parse "NAME: alias, alias" lines into {character: [aliases]}
+def parse_aliases(text):
+    aliases = {}
+    for line in text.splitlines():
+        if ":" not in line:
+            continue
+        name, names = line.split(":", 1)
+        name = name.strip()
+        if name:
+            aliases.setdefault(name, []).extend(alias.strip() for alias in names.split(",") if alias.strip())
+    return aliases
+
+
+# Inverted index of every character mention in the corpus dialogue and action text
+class MentionIndex:
+    def __init__(self, corpus, aliases=None):
+        self.corpus = corpus
+        # An alias folds into its canonical character, even when the alias also speaks under that name
+        canonical = {}
+        for name, names in (aliases or {}).items():
+            for alias in [name, *names]:
+                canonical[alias.lower()] = name
+        self.characters = []
+        self.character_ids = {}
+        self._canonical_ids = {}
+        # speaker_ids[i] is the index character behind corpus speaker id i
+        self.speaker_ids = np.zeros(len(corpus.characters), dtype=np.int64)
+        for speaker, name in enumerate(corpus.characters):
+            self.speaker_ids[speaker] = self._add(canonical.get(name.lower(), name))
+            self.character_ids.setdefault(name.lower(), int(self.speaker_ids[speaker]))
+        for alias, name in canonical.items():
+            # Aliases may introduce a character who never speaks
+            self.character_ids[alias] = self._add(name)
+        phrases = dict(self.character_ids)
+        matcher = PhraseMatcher(phrases)
+
+        # One pass over dialogue lines and scene action collects every mention
+        character, source, row, scene, start = [], [], [], [], []
+        for line, text in enumerate(corpus.line_text):
+            for offset, _, mentioned in matcher.find(text):
+                character.append(mentioned)
+                source.append(DIALOGUE)
+                row.append(line)
+                scene.append(corpus.line_scene[line])
+                start.append(offset)
+        for scene_number, text in enumerate(corpus.scene_actions):
+            for offset, _, mentioned in matcher.find(text):
+                character.append(mentioned)
+                source.append(ACTION)
+                row.append(scene_number)
+                scene.append(scene_number)
+                start.append(offset)
+
+        # Group mentions by character so positions for one character are a contiguous slice
+        character = np.asarray(character, dtype=np.int32)
+        order = np.argsort(character, kind="stable")
+        self.mention_character = character[order]
+        self.mention_source = np.asarray(source, dtype=np.int8)[order]
+        self.mention_row = np.asarray(row, dtype=np.int64)[order]
+        self.mention_scene = np.asarray(scene, dtype=np.int64)[order]
+        self.mention_start = np.asarray(start, dtype=np.int64)[order]
+        n_characters = len(self.characters)
+        self.counts = np.bincount(self.mention_character, minlength=n_characters)
+        self.dialogue_counts = np.bincount(self.mention_character[self.mention_source == DIALOGUE], minlength=n_characters)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)])
+
+        # Who talks about whom: speaker of the line x character mentioned in it
+        spoken = self.mention_source == DIALOGUE
+        speakers = self.speaker_ids[corpus.line_speaker[self.mention_row[spoken]]]
+        self.speaker_mentions = np.zeros((n_characters, n_characters), dtype=np.int64)
+        np.add.at(self.speaker_mentions, (speakers, self.mention_character[spoken]), 1)
+
+    # Function to get the index id of a canonical character, adding it on first sight
+    def _add(self, name):
+        character = self._canonical_ids.get(name.lower())
+        if character is None:
+            character = self._canonical_ids[name.lower()] = len(self.characters)
+            self.characters.append(name)
+        return character
+
+    def _id(self, name):
+        return self.character_ids.get(name.lower())
+
+    # Function to get how often a character or alias is mentioned, optionally only in dialogue
+    def count(self, name, dialogue_only=False):
+        character = self._id(name)
+        if character is None:
+            return 0
+        return int((self.dialogue_counts if dialogue_only else self.counts)[character])
+
+    # Function to list where a character is mentioned: source, row, scene and character offset
+    def positions(self, name):
+        character = self._id(name)
+        if character is None:
+            return pd.DataFrame(columns=["Source", "Row", "Scene", "Offset"])
+        found = slice(int(self.offsets[character]), int(self.offsets[character + 1]))
+        return pd.DataFrame({
+            "Source": np.where(self.mention_source[found] == DIALOGUE, "dialogue", "action"),
+            "Row": self.mention_row[found],
+            "Scene": self.mention_scene[found],
+            "Offset": self.mention_start[found],
+        })
+
+    # Function to get mention counts for every character
+    def summary(self):
+        return pd.DataFrame({
+            "Character": self.characters,
+            "Mentions": self.counts,
+            "In Dialogue": self.dialogue_counts,
+            "In Action": self.counts - self.dialogue_counts,
+        }).sort_values("Mentions", ascending=False, kind="stable")
+
+    # Function to list (speaker, mentioned, count) pairs, excluding characters naming themselves
+    def talks_about(self):
+        speakers, mentioned = np.nonzero(self.speaker_mentions)
+        keep = speakers != mentioned
+        speakers, mentioned = speakers[keep], mentioned[keep]
+        counts = self.speaker_mentions[speakers, mentioned]
+        order = np.argsort(-counts, kind="stable")
+        names = np.asarray(self.characters, dtype=object)
+        return pd.DataFrame({
+            "Speaker": names[speakers[order]],
+            "Talks About": names[mentioned[order]],
+            "Mentions": counts[order],
+        })
+
+    # Function to build the directed "who talks about whom" graph
+    def talks_about_graph(self):
+        graph = nx.DiGraph()
+        for speaker, mentioned, count in self.talks_about().itertuples(index=False):
+            graph.add_edge(speaker, mentioned, weight=int(count))
+        return graph
+
+
+# Function to get the mention index for a corpus and alias table; only the index for the latest table is kept
+def mention_index(corpus, aliases=None):
+    key = tuple(sorted((name, tuple(names)) for name, names in (aliases or {}).items()))
+    return corpus.memo_latest("mention_index", key, lambda corpus: MentionIndex(corpus, aliases))
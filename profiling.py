@@ -0,0 +1,134 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+
+DEFAULT_EXPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "spans.jsonl")
+
+# Spans kept per session between exports
+MAX_SPANS = 10000
+
+# Streamlit runs each session's script on its own thread, so the active profiler is per thread
+_local = threading.local()
+
+# tracemalloc is process-wide: memory-capturing profilers share it, and the last one out stops it
+_tracing_lock = threading.Lock()
+_tracing_profilers = 0
+_tracing_started = False
+
+
+class _Frame:
+    def __init__(self, name, depth, start, memory_start):
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.memory_start = memory_start
+        self.peak = 0
+
+
+# Collects timing spans, and optionally peak memory, for one rerun of one page
+class Profiler:
+    def __init__(self, page, session=None, memory=False):
+        self.page = page
+        self.session = session or uuid.uuid4().hex
+        self.rerun = uuid.uuid4().hex
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self._timestamp = time.time()
+
+    def __enter__(self):
+        global _tracing_profilers, _tracing_started
+        if self.memory:
+            with _tracing_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _tracing_started = True
+                _tracing_profilers += 1
+        _local.profiler = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _tracing_profilers, _tracing_started
+        _local.profiler = None
+        self.total = time.perf_counter() - self._started
+        if self.memory:
+            with _tracing_lock:
+                _tracing_profilers -= 1
+                # Tracing started by someone else, e.g. the benchmark suite, is left running
+                if _tracing_profilers == 0 and _tracing_started:
+                    tracemalloc.stop()
+                    _tracing_started = False
+        return False
+
+    # Function to fold the traced peak since the last reset into every open span
+    def _flush_peak(self):
+        with _tracing_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is process-wide, so it is only reset while no other session is capturing.
+            # With overlapping sessions, peaks are upper bounds that may include the other sessions' allocations.
+            if _tracing_profilers == 1:
+                tracemalloc.reset_peak()
+        for frame in self._stack:
+            frame.peak = max(frame.peak, peak)
+        return current
+
+    @contextlib.contextmanager
+    def span(self, name):
+        tracing = self.memory and tracemalloc.is_tracing()
+        memory_start = self._flush_peak() if tracing else 0
+        frame = _Frame(name, len(self._stack), time.perf_counter(), memory_start)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - frame.start
+            if tracing:
+                self._flush_peak()
+            self._stack.pop()
+            self.spans.append({
+                "timestamp": self._timestamp,
+                "session": self.session,
+                "rerun": self.rerun,
+                "page": self.page,
+                "span": name,
+                "depth": frame.depth,
+                "start": round(frame.start - self._started, 6),
+                "seconds": round(seconds, 6),
+                # Memory allocated above the level at span start, at its highest point
+                "peak_bytes": max(0, frame.peak - frame.memory_start) if tracing else None,
+            })
+
+    # Function to list the spans in the order they started
+    def breakdown(self):
+        return sorted(self.spans, key=lambda span: span["start"])
+
+
+# Function to time a stage under the active profiler; does nothing when profiling is off
+@contextlib.contextmanager
+def span(name):
+    profiler = getattr(_local, "profiler", None)
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name):
+        yield
+
+
+# Function to append spans to a JSON-lines file for offline analysis
+def export_spans(spans, path=None):
+    path = path or os.environ.get("PROFILE_EXPORT_PATH", DEFAULT_EXPORT_PATH)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        for record in spans:
+            handle.write(json.dumps(record) + "\n")
+    return path
+
+
+# Function to render spans as JSON lines, e.g. for a download button
+def spans_to_jsonl(spans):
+    return "".join(json.dumps(record) + "\n" for record in spans)
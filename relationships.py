@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from resources import lazy_import
+
+sparse = lazy_import("scipy.sparse")
+
+# Ways of weighting an edge between two characters
+RELATIONSHIP_WEIGHTS = {
+    "scenes": "Shared scenes",
+    "exchanges": "Adjacent dialogue exchanges",
+    "words": "Words exchanged",
+}
+
+EDGE_COLUMNS = ["Character 1", "Character 2", "Weight"]
+
+
+# Function to build the scene x character matrix; values are word counts or 1 for presence
+def incidence_matrix(corpus, values="presence"):
+    shape = (corpus.n_scenes, corpus.n_characters)
+    if values == "words":
+        data = corpus.line_words.astype(np.float64)
+    else:
+        data = np.ones(corpus.n_lines, dtype=np.float64)
+    # Duplicate (scene, speaker) entries are summed when converting to CSR
+    matrix = sparse.coo_matrix((data, (corpus.line_scene, corpus.line_speaker)), shape=shape).tocsr()
+    if values == "presence":
+        matrix.data[:] = 1.0
+    return matrix
+
+
+# Function to count adjacent lines spoken by two different characters in the same scene
+def _exchange_matrix(corpus):
+    same_scene = corpus.line_scene[1:] == corpus.line_scene[:-1]
+    first = corpus.line_speaker[:-1][same_scene]
+    second = corpus.line_speaker[1:][same_scene]
+    shape = (corpus.n_characters, corpus.n_characters)
+    matrix = sparse.coo_matrix((np.ones(len(first)), (first, second)), shape=shape).tocsr()
+    return matrix + matrix.T
+
+
+# Function to compute the symmetric character x character co-occurrence matrix
+def compute_co_occurrence(corpus, weight="scenes"):
+    if weight not in RELATIONSHIP_WEIGHTS:
+        raise ValueError(f"Unknown relationship weight {weight!r}; expected one of {', '.join(RELATIONSHIP_WEIGHTS)}")
+    if weight == "scenes":
+        presence = incidence_matrix(corpus)
+        matrix = (presence.T @ presence).tocsr()
+    elif weight == "exchanges":
+        matrix = _exchange_matrix(corpus)
+    else:
+        # Words each character speaks in scenes shared with the other, summed over both directions
+        presence = incidence_matrix(corpus)
+        words = incidence_matrix(corpus, values="words")
+        shared = (words.T @ presence).tocsr()
+        matrix = shared + shared.T
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    return matrix
+
+
+# Function to get the co-occurrence matrix for a weighting, computed once per corpus
+def co_occurrence(corpus, weight="scenes"):
+    return corpus.memo(f"co_occurrence:{weight}", lambda corpus: compute_co_occurrence(corpus, weight))
+
+
+# Function to list each relationship once, strongest first, optionally thresholded and cut to the top k
+def top_edges(corpus, weight="scenes", k=None, min_weight=0):
+    upper = sparse.triu(co_occurrence(corpus, weight), k=1).tocoo()
+    keep = upper.data >= min_weight
+    rows, cols, values = upper.row[keep], upper.col[keep], upper.data[keep]
+    order = np.argsort(-values, kind="stable")
+    if k is not None:
+        order = order[:k]
+    characters = np.asarray(corpus.characters, dtype=object)
+    return pd.DataFrame({
+        "Character 1": characters[rows[order]],
+        "Character 2": characters[cols[order]],
+        "Weight": values[order].astype(np.int64),
+    }, columns=EDGE_COLUMNS)
@@ -0,0 +1,105 @@
+import importlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Pre-populated directory holding NLTK data and model snapshots; APP_RESOURCE_DIR overrides it
+RESOURCE_DIR = os.environ.get("APP_RESOURCE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources"))
+NLTK_DATA_DIR = os.path.join(RESOURCE_DIR, "nltk_data")
+MODEL_DIR = os.path.join(RESOURCE_DIR, "models")
+
+NLTK_RESOURCES = ["vader_lexicon", "punkt", "punkt_tab"]
+
+# What was loaded since the process started, in load order, with seconds taken
+_startup_report = OrderedDict()
+_report_lock = threading.RLock()
+
+
+# Function to record how long a startup step took, keeping the first measurement
+def record(step, seconds):
+    with _report_lock:
+        _startup_report.setdefault(step, seconds)
+
+
+# Function to list the recorded startup steps as (step, seconds) pairs
+def startup_report():
+    with _report_lock:
+        return list(_startup_report.items())
+
+
+# Stand-in for a module that imports it on first attribute access and times the import
+class LazyModule:
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        # Per module, so a slow import does not hold up other modules or the startup report
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._on_load is not None:
+                        self._on_load()
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    record(f"import {self._name}", time.perf_counter() - start)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+
+# Function to declare a module that is only imported when a page first uses it
+def lazy_import(name, on_load=None):
+    return LazyModule(name, on_load=on_load)
+
+
+_nltk_ready = False
+_nltk_lock = threading.Lock()
+
+
+# Function to point NLTK at the local resource directory; nothing is ever downloaded at runtime
+def provision_nltk():
+    global _nltk_ready
+    with _nltk_lock:
+        if _nltk_ready:
+            return
+        start = time.perf_counter()
+        import nltk.data
+
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+        _nltk_ready = True
+        record("provision NLTK data", time.perf_counter() - start)
+
+
+# Function to resolve a model name to its local snapshot when one has been provisioned
+def model_source(model_name):
+    local = os.path.join(MODEL_DIR, model_name.replace("/", "--"))
+    return local if os.path.isdir(local) else model_name
+
+
+# Function to download every resource the app needs into the resource directory, run once at build time
+def populate_resources():
+    import nltk
+
+    from emotions import EMOTION_MODEL
+
+    os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+    for resource in NLTK_RESOURCES:
+        nltk.download(resource, download_dir=NLTK_DATA_DIR)
+
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    target = os.path.join(MODEL_DIR, EMOTION_MODEL.replace("/", "--"))
+    AutoTokenizer.from_pretrained(EMOTION_MODEL).save_pretrained(target)
+    AutoModelForSequenceClassification.from_pretrained(EMOTION_MODEL).save_pretrained(target)
+    print(f"Resources written to {RESOURCE_DIR}")
+
+
+if __name__ == "__main__":
+    populate_resources()
@@ -0,0 +1,208 @@
+import hashlib
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from emotions import EMOTION_LABELS, score_emotions
+from profiling import span
+from score_store import normalize_text
+from sentiment import score_sentiment
+
+# Per-character totals kept across drafts; Sentiment and emotions are sums until divided by the scored lines
+COUNT_COLUMNS = ["Scenes", "Lines", "Words"]
+
+# Pair totals, in the order of the relationship weights
+PAIR_WEIGHTS = ["scenes", "exchanges", "words"]
+
+MOVED_COLUMNS = ["Character", "Metric", "Before", "After", "Change"]
+
+
+# Function to fingerprint one scene by its heading, cast and dialogue; whitespace-only edits keep the fingerprint
+def scene_fingerprint(heading, speakers, dialogue):
+    digest = hashlib.sha1(normalize_text(heading).encode("utf-8"))
+    for speaker, text in zip(speakers, dialogue):
+        digest.update(f"\0{speaker}\0{normalize_text(text)}".encode("utf-8"))
+    return digest.digest()
+
+
+# Function to fingerprint every scene of a corpus, computed once per corpus
+def scene_fingerprints(corpus):
+    def compute(corpus):
+        characters = np.asarray(corpus.characters, dtype=object)
+        fingerprints = []
+        for scene in range(corpus.n_scenes):
+            lines = corpus.scene_lines(scene)
+            fingerprints.append(scene_fingerprint(
+                corpus.scene_names[scene], characters[corpus.line_speaker[lines]], corpus.line_text[lines]
+            ))
+        return fingerprints
+
+    return corpus.memo("scene_fingerprints", compute)
+
+
+# What one scene adds to the totals, keyed by character name so it survives re-interning in the next draft
+class SceneContribution:
+    def __init__(self, counts, pairs, scores):
+        # {name: [scenes, lines, words]}, {(name, name): [scenes, exchanges, words]}, {name: score sums}
+        self.counts = counts
+        self.pairs = pairs
+        self.scores = scores
+
+
+# Function to compute one scene's contribution from its line slice and the line scores
+def scene_contribution(corpus, scene, scores):
+    lines = corpus.scene_lines(scene)
+    speakers = corpus.line_speaker[lines]
+    if len(speakers) == 0:
+        return SceneContribution({}, {}, {})
+    names = corpus.characters
+    words = corpus.line_words[lines]
+    cast, inverse = np.unique(speakers, return_inverse=True)
+    line_counts = np.bincount(inverse, minlength=len(cast))
+    word_counts = np.bincount(inverse, weights=words, minlength=len(cast))
+    score_sums = np.zeros((len(cast), scores.shape[1]))
+    np.add.at(score_sums, inverse, scores[lines])
+
+    counts = {names[c]: np.array([1, line_counts[i], word_counts[i]], dtype=np.float64) for i, c in enumerate(cast)}
+    pairs = {}
+    for i in range(len(cast)):
+        for j in range(i + 1, len(cast)):
+            key = tuple(sorted((names[cast[i]], names[cast[j]])))
+            pairs[key] = np.array([1, 0, word_counts[i] + word_counts[j]], dtype=np.float64)
+    # Adjacent lines by two different speakers, counted in either order
+    for first, second in zip(speakers[:-1], speakers[1:]):
+        if first != second:
+            pairs[tuple(sorted((names[first], names[second])))][1] += 1
+    return SceneContribution(counts, pairs, {names[c]: score_sums[i] for i, c in enumerate(cast)})
+
+
+# Function to add a contribution into running totals, times a signed multiplicity
+def _apply(totals, contribution, times):
+    for key, value in contribution.items():
+        total = totals.get(key)
+        total = value * times if total is None else total + value * times
+        # Drop keys that fall back to zero so removed characters and pairs disappear
+        if np.allclose(total, 0):
+            totals.pop(key, None)
+        else:
+            totals[key] = total
+
+
+# Scene-level diff between two drafts
+class RevisionDiff:
+    def __init__(self, added, removed, unchanged, moved):
+        self.added = added
+        self.removed = removed
+        self.unchanged = unchanged
+        self.moved = moved
+
+    @property
+    def changed_characters(self):
+        return sorted(set(self.moved["Character"]))
+
+
+# Running per-character counts, co-occurrence totals and score sums, updated scene by scene across drafts
+class RevisionTracker:
+    def __init__(self, store=None, emotions=False):
+        self.store = store
+        self.emotions = emotions
+        self.key = None
+        self.scenes = Counter()
+        self.contributions = {}
+        self.counts = {}
+        self.pairs = {}
+        self.scores = {}
+        self._lock = threading.Lock()
+
+    # Function to score the dialogue lines of the given scenes: VADER compound first, then the emotion labels
+    def _score(self, corpus, scenes):
+        rows = np.arange(corpus.n_lines)[np.isin(corpus.line_scene, scenes)]
+        texts = list(corpus.line_text[rows])
+        columns = [score_sentiment(texts, store=self.store)[:, None]]
+        if self.emotions:
+            columns.append(score_emotions(texts, store=self.store))
+        scores = np.zeros((corpus.n_lines, sum(column.shape[1] for column in columns)), dtype=np.float64)
+        scores[rows] = np.hstack(columns)
+        return scores
+
+    # Function to bring the totals from the previously analyzed draft to this one, touching only changed scenes
+    def update(self, corpus):
+        with self._lock:
+            if corpus.key is not None and corpus.key == self.key:
+                return RevisionDiff(0, 0, sum(self.scenes.values()), pd.DataFrame(columns=MOVED_COLUMNS))
+            fingerprints = scene_fingerprints(corpus)
+            new_scenes = Counter(fingerprints)
+            removed = self.scenes - new_scenes
+            added = new_scenes - self.scenes
+            baseline = self.key is None
+            before = self.character_table()
+
+            with span(f"revision diff (-{sum(removed.values())} +{sum(added.values())} scenes)"):
+                # Score and measure one copy of each new scene first; repeats just multiply it.
+                # Nothing is applied until this succeeds, so a failed scorer leaves the totals untouched.
+                first = {}
+                for scene, fingerprint in enumerate(fingerprints):
+                    if fingerprint in added:
+                        first.setdefault(fingerprint, scene)
+                scores = self._score(corpus, sorted(first.values()))
+                contributions = {fingerprint: scene_contribution(corpus, scene, scores) for fingerprint, scene in first.items()}
+
+                for fingerprint, times in removed.items():
+                    self._apply(self.contributions[fingerprint], -times)
+                for fingerprint, contribution in contributions.items():
+                    self._apply(contribution, added[fingerprint])
+                self.contributions.update(contributions)
+                for fingerprint in removed:
+                    if fingerprint not in new_scenes:
+                        del self.contributions[fingerprint]
+
+            unchanged = sum((new_scenes & self.scenes).values())
+            self.scenes = new_scenes
+            self.key = corpus.key
+            # The first draft is the baseline, so nothing has moved yet
+            moved = pd.DataFrame(columns=MOVED_COLUMNS) if baseline else moved_characters(before, self.character_table())
+            return RevisionDiff(sum(added.values()), sum(removed.values()), unchanged, moved)
+
+    def _apply(self, contribution, times):
+        _apply(self.counts, contribution.counts, times)
+        _apply(self.pairs, contribution.pairs, times)
+        _apply(self.scores, contribution.scores, times)
+
+    # Function to get the current per-character totals, with sentiment and emotions as per-line means
+    def character_table(self):
+        names = sorted(self.counts, key=lambda name: -self.counts[name][1])
+        table = pd.DataFrame([self.counts[name] for name in names], columns=COUNT_COLUMNS).astype(np.int64)
+        table.insert(0, "Character", names)
+        lines = np.maximum(table["Lines"].to_numpy(), 1)
+        labels = ["Sentiment"] + (EMOTION_LABELS if self.emotions else [])
+        sums = np.array([self.scores.get(name, np.zeros(len(labels))) for name in names]).reshape(len(names), len(labels))
+        for i, label in enumerate(labels):
+            table[label] = sums[:, i] / lines
+        return table
+
+    # Function to list the current relationships for one weighting, strongest first
+    def edges(self, weight="scenes"):
+        column = PAIR_WEIGHTS.index(weight)
+        rows = sorted(((a, b, int(round(value[column]))) for (a, b), value in self.pairs.items() if value[column] > 0),
+                      key=lambda row: -row[2])
+        return pd.DataFrame(rows, columns=["Character 1", "Character 2", "Weight"])
+
+
+# Function to list every character metric that differs between two character tables
+def moved_characters(before, after):
+    before = before.set_index("Character")
+    after = after.set_index("Character")
+    names = sorted(set(before.index) | set(after.index))
+    rows = []
+    for metric in after.columns:
+        old = before[metric].reindex(names) if metric in before.columns else pd.Series(np.nan, index=names)
+        new = after[metric].reindex(names)
+        for name, previous, current in zip(names, old, new):
+            if pd.isna(previous) and pd.isna(current):
+                continue
+            if pd.isna(previous) or pd.isna(current) or not np.isclose(previous, current):
+                change = None if pd.isna(previous) or pd.isna(current) else current - previous
+                rows.append((name, metric, previous, current, change))
+    return pd.DataFrame(rows, columns=MOVED_COLUMNS).sort_values("Character", kind="stable", ignore_index=True)
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "scores.sqlite")
+
+# Size of stored score blobs above which the least recently used rows are evicted
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# How long a connection waits for another process's write lock before SQLite gives up
+BUSY_TIMEOUT = 30.0
+
+# Further attempts, with growing back-off, when the lock is still held after the busy timeout
+LOCK_RETRIES = 5
+
+# Eviction trims down to this fraction of the limit so it does not run on every write
+EVICTION_TARGET = 0.9
+
+_WHITESPACE = re.compile(r"\s+")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+# Function to normalize a line so formatting-only edits hit the same cache entry
+def normalize_text(text):
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+# Function to build the content address of a line scored by a given model or lexicon
+def score_key(scorer, text):
+    return hashlib.sha1(f"{scorer}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+# Content-addressed SQLite store of per-line score vectors with size-based LRU eviction
+class ScoreStore:
+    def __init__(self, path=DEFAULT_STORE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Batch workers and the emotion worker pool share one database file
+        self._connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._retry(self._create_schema)
+
+    def _create_schema(self):
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key BLOB PRIMARY KEY, scorer TEXT NOT NULL, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        # Running total of the stored bytes, kept by triggers in the same transaction as every write
+        self._connection.execute("CREATE TABLE IF NOT EXISTS store_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS scores_size_insert AFTER INSERT ON scores BEGIN "
+            "UPDATE store_meta SET value = value + new.size WHERE name = 'total_size'; END"
+        )
+        self._connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS scores_size_update AFTER UPDATE OF size ON scores BEGIN "
+            "UPDATE store_meta SET value = value + new.size - old.size WHERE name = 'total_size'; END"
+        )
+        self._connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS scores_size_delete AFTER DELETE ON scores BEGIN "
+            "UPDATE store_meta SET value = value - old.size WHERE name = 'total_size'; END"
+        )
+        # Stores written before the running total existed are summed once
+        self._connection.execute(
+            "INSERT OR IGNORE INTO store_meta SELECT 'total_size', COALESCE(SUM(size), 0) FROM scores"
+        )
+        self._connection.commit()
+
+    # Function to run a transaction, rolling back and retrying while another process holds the lock
+    def _retry(self, transaction, *args):
+        for attempt in range(LOCK_RETRIES + 1):
+            try:
+                return transaction(*args)
+            except sqlite3.OperationalError as error:
+                self._connection.rollback()
+                if "locked" not in str(error) or attempt == LOCK_RETRIES:
+                    raise
+                time.sleep(0.1 * 2 ** attempt)
+
+    # Function to fetch stored vectors for the given keys as {key: array}
+    def get_many(self, keys):
+        with self._lock:
+            return self._retry(self._get_many, keys)
+
+    def _get_many(self, keys):
+        found = {}
+        now = time.time()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(
+                f"SELECT key, value FROM scores WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, value in rows:
+                found[key] = np.frombuffer(value, dtype=np.float32)
+            if rows:
+                self._connection.execute(
+                    f"UPDATE scores SET last_used = ? WHERE key IN ({placeholders})", [now, *chunk]
+                )
+        self._connection.commit()
+        return found
+
+    # Function to store score vectors for (key, vector) pairs of one scorer
+    def put_many(self, scorer, items):
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            value = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((key, scorer, value, len(value), now))
+        with self._lock:
+            self._retry(self._put_many, rows)
+
+    def _put_many(self, rows):
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+        self._connection.executemany(
+            "INSERT INTO scores VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+            "scorer = excluded.scorer, value = excluded.value, size = excluded.size, last_used = excluded.last_used",
+            rows,
+        )
+        self._evict()
+        self._connection.commit()
+
+    # Function to drop the least recently used rows once the store outgrows its limit
+    def _evict(self):
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * EVICTION_TARGET)
+        freed = 0
+        stale = []
+        for key, size in self._connection.execute("SELECT key, size FROM scores ORDER BY last_used"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._connection.executemany("DELETE FROM scores WHERE key = ?", stale)
+
+    def _total_size(self):
+        return self._connection.execute("SELECT value FROM store_meta WHERE name = 'total_size'").fetchone()[0]
+
+    # Function to report the number of stored lines and their total size in bytes
+    def stats(self):
+        with self._lock:
+            count = self._connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            size = self._total_size()
+        return {"lines": count, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+# Function to score lines through the store, sending only lines it has not seen to the scorer
+def cached_scores(store, scorer, texts, compute, width):
+    texts = list(texts)
+    scores = np.zeros((len(texts), width), dtype=np.float32)
+    if not texts:
+        return scores
+    if store is None:
+        scores[:] = np.asarray(compute(texts), dtype=np.float32).reshape(len(texts), width)
+        return scores
+
+    keys = [score_key(scorer, text) for text in texts]
+    found = store.get_many(list(set(keys)))
+
+    # Each unseen line is scored once, however often it repeats
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+    if missing:
+        computed = np.asarray(compute(list(missing.values())), dtype=np.float32).reshape(len(missing), width)
+        store.put_many(scorer, zip(missing, computed))
+        found.update(zip(missing, computed))
+
+    for row, key in enumerate(keys):
+        scores[row] = found[key]
+    return scores
+
+
+# Function to get the process-wide score store; SCORE_CACHE_PATH and SCORE_CACHE_MAX_MB override the defaults
+def get_score_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = os.environ.get("SCORE_CACHE_PATH", DEFAULT_STORE_PATH)
+            max_bytes = int(float(os.environ.get("SCORE_CACHE_MAX_MB", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024)
+            _store = ScoreStore(path, max_bytes=max_bytes)
+        return _store
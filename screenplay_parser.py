@@ -0,0 +1,206 @@
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import zipfile
+from collections import namedtuple
+
+# One parsed scene in the shape of a screenplay CSV row
+SceneRecord = namedtuple("SceneRecord", ["heading", "action", "speakers", "dialogue", "contents"])
+
+SCENE_HEADING = re.compile(r"^\s*(?:[A-Z]?\d+[A-Z]*\s+)?((?:INT|EXT|INT\.?/EXT|I/E)\.?\s.*)$")
+# Uppercase cue such as "DEADPOOL", "DR. KILLEBREW (V.O.)" or "WADE (CONT'D)"
+SPEAKER_CUE = re.compile(r"^\s*([A-Z][A-Z0-9'’.\- ]*[A-Z0-9'’])\s*(\([^)]*\)\s*)*$")
+PARENTHETICAL = re.compile(r"^\s*\(.*\)\s*$")
+TRANSITION = re.compile(r"^\s*(?:[A-Z ]+ TO:|FADE (?:IN|OUT)[.:]?|CUT TO BLACK[.:]?|DISSOLVE TO:?)\s*$")
+SCENE_NUMBER = re.compile(r"\s+[A-Z]?\d+[A-Z]*\s*$")
+# Page furniture left behind by PDF extraction: page counters, draft headers, continuation marks
+PAGE_NOISE = [
+    re.compile(r"^\s*Page\s+\d+.*$", re.IGNORECASE),
+    re.compile(r"^.*\bShooting Script\b.*$", re.IGNORECASE),
+    re.compile(r"^\s*\d+\.?\s*$"),
+    re.compile(r"^\s*\(?(?:CONTINUED|CONT'D|MORE)\)?:?\s*$"),
+]
+MAX_CUE_LENGTH = 40
+_WHITESPACE = re.compile(r"\s+")
+
+
+# Function to tell whether a line is page-header or footer noise
+def is_noise(line, noise_patterns=PAGE_NOISE):
+    return any(pattern.match(line) for pattern in noise_patterns)
+
+
+# Function to get the speaker name from a cue line, or None when the line is not a cue
+def speaker_from_cue(line):
+    stripped = line.strip()
+    if len(stripped) > MAX_CUE_LENGTH or TRANSITION.match(stripped) or SCENE_HEADING.match(stripped):
+        return None
+    match = SPEAKER_CUE.match(stripped)
+    if match is None:
+        return None
+    return match.group(1).strip()
+
+
+# Function to normalize a scene heading: drop trailing scene numbers and the dash before the time of day
+def clean_heading(heading):
+    heading = SCENE_NUMBER.sub("", heading.strip())
+    return _WHITESPACE.sub(" ", heading.replace(" - ", "  ")).strip()
+
+
+def _clean(parts):
+    return _WHITESPACE.sub(" ", " ".join(parts)).strip()
+
+
+# Generator that reads raw screenplay lines one at a time and yields a SceneRecord per scene
+def parse_screenplay(lines, noise_patterns=PAGE_NOISE):
+    heading = None
+    action = []
+    speakers = []
+    dialogue = []
+    contents = []
+    pending_cue = None  # cue line not yet confirmed by a following line of dialogue
+    in_dialogue = False
+
+    def scene():
+        return SceneRecord(
+            heading=heading,
+            action=_clean(action),
+            speakers=list(speakers),
+            dialogue=[_clean(line) for line in dialogue],
+            contents=_clean(contents),
+        )
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if is_noise(line, noise_patterns):
+            continue
+        stripped = line.strip()
+
+        heading_match = SCENE_HEADING.match(stripped)
+        if heading_match:
+            if heading is not None:
+                if pending_cue is not None:
+                    action.append(pending_cue)
+                yield scene()
+            heading = clean_heading(heading_match.group(1))
+            action, speakers, dialogue, contents = [], [], [], []
+            pending_cue = None
+            in_dialogue = False
+            continue
+        if heading is None:
+            # Title page and anything else before the first scene
+            continue
+
+        if not stripped:
+            if pending_cue is not None:
+                # A lone uppercase line followed by a blank is a sound effect or shout, not a cue
+                action.append(pending_cue)
+                pending_cue = None
+            in_dialogue = False
+            continue
+        contents.append(stripped)
+
+        if pending_cue is not None:
+            speakers.append(speaker_from_cue(pending_cue))
+            dialogue.append([])
+            pending_cue = None
+            in_dialogue = True
+        elif not in_dialogue and speaker_from_cue(stripped) is not None:
+            pending_cue = stripped
+            continue
+
+        if in_dialogue:
+            # Parentheticals such as "(beat)" are direction, not spoken text
+            if not PARENTHETICAL.match(stripped):
+                dialogue[-1].append(stripped)
+        elif not TRANSITION.match(stripped):
+            action.append(stripped)
+
+    if heading is not None:
+        if pending_cue is not None:
+            action.append(pending_cue)
+        yield scene()
+
+
+# Function to write scene records in the screenplay CSV schema, one row at a time
+def write_screenplay_csv(records, handle):
+    writer = csv.writer(handle)
+    writer.writerow(["", "Scene_Names", "Scene_action", "Scene_Characters", "Scene_Dialogue", "Contents"])
+    count = 0
+    for index, record in enumerate(records):
+        # Scenes without dialogue leave the list columns empty, as in the existing CSVs
+        writer.writerow([
+            index,
+            record.heading,
+            record.action,
+            repr(record.speakers) if record.speakers else "",
+            repr(record.dialogue) if record.dialogue else "",
+            record.contents,
+        ])
+        count += 1
+    return count
+
+
+# Generator over (name, line iterator) pairs for a text file, a directory of them, or a zip archive
+def iter_script_sources(path, encoding="utf-8"):
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(".txt"):
+                yield from iter_script_sources(os.path.join(path, name), encoding)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.infolist():
+                if not member.is_dir() and member.filename.lower().endswith(".txt"):
+                    with archive.open(member) as raw:
+                        yield member.filename, io.TextIOWrapper(raw, encoding=encoding, errors="replace")
+    else:
+        with open(path, encoding=encoding, errors="replace") as handle:
+            yield path, handle
+
+
+# Function to convert raw screenplay text into screenplay CSVs, one per script
+def convert(path, output, encoding="utf-8"):
+    written = []
+    for name, lines in iter_script_sources(path, encoding):
+        if os.path.isdir(output) or not output.lower().endswith(".csv"):
+            os.makedirs(output, exist_ok=True)
+            target = os.path.join(output, os.path.splitext(os.path.basename(name))[0] + ".csv")
+        else:
+            target = output
+            if written:
+                raise ValueError(f"{path} holds several scripts; pass a directory as the output")
+        with open(target, "w", newline="", encoding="utf-8") as handle:
+            scenes = write_screenplay_csv(parse_screenplay(lines), handle)
+        written.append((target, scenes))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert raw screenplay text into the screenplay CSV schema.")
+    parser.add_argument("inputs", nargs="+", help="script .txt files, directories of them, or .zip archives")
+    parser.add_argument("-o", "--output", default="-", help="CSV file, or a directory for one CSV per script (default: stdout)")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args(argv)
+
+    single_file = args.output == "-" or (not os.path.isdir(args.output) and args.output.lower().endswith(".csv"))
+    if single_file:
+        # Several scripts into one CSV would overwrite each other, or on stdout repeat the header and index;
+        # count them before writing anything
+        sources = sum(1 for path in args.inputs for _ in iter_script_sources(path, args.encoding))
+        if sources > 1:
+            parser.error(f"{sources} scripts matched; pass a directory as the output")
+    if args.output == "-":
+        for path in args.inputs:
+            for _, lines in iter_script_sources(path, args.encoding):
+                write_screenplay_csv(parse_screenplay(lines), sys.stdout)
+        return 0
+    for path in args.inputs:
+        for target, scenes in convert(path, args.output, args.encoding):
+            print(f"{target}: {scenes} scenes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+import functools
+import hashlib
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from profiling import span
+from resources import lazy_import, provision_nltk
+from score_store import cached_scores
+
+vader = lazy_import("nltk.sentiment.vader", on_load=provision_nltk)
+tokenize = lazy_import("nltk.tokenize", on_load=provision_nltk)
+
+# Tokens that look like words; punctuation and contraction fragments are left out of the clouds
+_WORD = re.compile(r"\w[\w']*")
+
+_analyzer = None
+_identity = None
+_analyzer_lock = threading.Lock()
+
+
+# Function to get the process-wide VADER analyzer and the identity of its lexicon
+def get_sentiment_analyzer():
+    global _analyzer, _identity
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = vader.SentimentIntensityAnalyzer()
+            lexicon = "\n".join(f"{word}\t{score}" for word, score in sorted(_analyzer.lexicon.items()))
+            _identity = "vader:" + hashlib.sha1(lexicon.encode("utf-8")).hexdigest()
+        return _analyzer, _identity
+
+
+# Function to compute the VADER compound score of each line, reusing stored scores for lines seen before
+def score_sentiment(texts, store=None):
+    analyzer, identity = get_sentiment_analyzer()
+
+    def compute(lines):
+        with span(f"VADER scoring ({len(lines)} lines)"):
+            return np.array([analyzer.polarity_scores(line)["compound"] for line in lines], dtype=np.float32)
+
+    return cached_scores(store, identity, texts, compute, 1)[:, 0]
+
+
+# Function to compute the average VADER compound score of each character's lines
+def compute_character_sentiment(corpus, store=None):
+    compound = score_sentiment(corpus.line_text, store=store)
+    totals = np.bincount(corpus.line_speaker, weights=compound, minlength=corpus.n_characters)
+    lines = np.bincount(corpus.line_speaker, minlength=corpus.n_characters)
+    return dict(zip(corpus.characters, totals / np.maximum(lines, 1)))
+
+
+# Function to compute the VADER compound score of a single word, once per distinct word
+@functools.lru_cache(maxsize=65536)
+def word_polarity(word):
+    analyzer, _ = get_sentiment_analyzer()
+    return analyzer.polarity_scores(word)["compound"]
+
+
+# Function to count how often each word occurs across the given lines
+def token_frequencies(texts):
+    if isinstance(texts, str):
+        texts = [texts]
+    frequencies = Counter()
+    for text in texts:
+        frequencies.update(token.lower() for token in tokenize.word_tokenize(text) if _WORD.fullmatch(token))
+    return frequencies
+
+
+# Function to split word frequencies into positive and negative words, scoring each distinct word once
+def split_by_polarity(frequencies):
+    positive = {}
+    negative = {}
+    for word, count in frequencies.items():
+        polarity = word_polarity(word)
+        if polarity > 0:
+            positive[word] = count
+        elif polarity < 0:
+            negative[word] = count
+    return positive, negative
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from corpus import ScriptCorpus
+from mentions import MentionIndex, PhraseMatcher, mention_index, parse_aliases
+
+
+def make_corpus(scenes):
+    rows = [
+        (f"INT. ROOM {i}", action, repr([s for s, _ in lines]), repr([t for _, t in lines]), action)
+        for i, (action, lines) in enumerate(scenes)
+    ]
+    df = pd.DataFrame(rows, columns=["Scene_Names", "Scene_action", "Scene_Characters", "Scene_Dialogue", "Contents"])
+    return ScriptCorpus.from_frame(df)
+
+
+def test_failure_links_resume_inside_a_partial_match():
+    # After "jo ann" the scan cannot continue "jo annx"; its failure link must land on "ann" to find "ann lee"
+    matcher = PhraseMatcher({"jo annx": 1, "ann lee": 2})
+    assert matcher.find("jo ann lee") == [(3, 10, 2)]
+    matcher = PhraseMatcher({"he": "he", "she": "she", "his": "his", "hers": "hers"})
+    assert [value for _, _, value in matcher.find("she said hers, not his")] == ["she", "hers", "his"]
+
+
+def test_leftmost_longest_and_whole_words():
+    matcher = PhraseMatcher({"wade": 1, "wade wilson": 2, "pool": 3})
+    assert matcher.find("Wade Wilson met Wade.") == [(0, 11, 2), (16, 20, 1)]
+    # Names inside longer words are not mentions
+    assert matcher.find("Deadpool swims in the pool") == [(22, 26, 3)]
+
+
+def test_aliases_fold_into_the_canonical_character():
+    corpus = make_corpus([
+        ("Wade walks in.", [("WADE", "Where is Vanessa?"), ("VANESSA", "Right here, Wade.")]),
+        ("Pool party.", [("DEADPOOL", "Vanessa, it's me, Wade Wilson.")]),
+    ])
+    index = MentionIndex(corpus, parse_aliases("DEADPOOL: Wade, Pool, Wade Wilson"))
+    assert "WADE" not in index.characters
+    assert index.count("Wade") == index.count("DEADPOOL") == 4
+    assert index.count("Deadpool", dialogue_only=True) == 2
+    talks = {(speaker, mentioned): count for speaker, mentioned, count in index.talks_about().itertuples(index=False)}
+    assert talks == {("DEADPOOL", "VANESSA"): 2, ("VANESSA", "DEADPOOL"): 1}
+
+
+def test_only_the_latest_alias_table_is_kept():
+    corpus = make_corpus([("Wade walks in.", [("WADE", "Hi, Vanessa."), ("VANESSA", "Hi.")])])
+    first = mention_index(corpus, parse_aliases("WADE: Deadpool"))
+    assert mention_index(corpus, parse_aliases("WADE: Deadpool")) is first
+    second = mention_index(corpus, parse_aliases("WADE: Pool"))
+    assert second is not first
+    assert sum(1 for name in corpus._derived if name.startswith("mention_index")) == 1
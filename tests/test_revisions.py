@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import revisions
+from character_stats import character_statistics
+from corpus import ScriptCorpus
+from relationships import RELATIONSHIP_WEIGHTS, top_edges
+from synthetic_screenplay import generate_screenplay
+
+
+# Deterministic stand-in for VADER so the arithmetic can be checked without the lexicon
+def fake_sentiment(texts, store=None):
+    return np.array([(len(text) % 7 - 3) / 3 for text in texts], dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def offline_scores(monkeypatch):
+    monkeypatch.setattr(revisions, "score_sentiment", fake_sentiment)
+
+
+def drafts():
+    first = generate_screenplay(scenes=60, cast=12, seed=3)
+    second = first.copy()
+    # Edit one scene's dialogue, rename one heading, drop two scenes, repeat one
+    second.loc[4, "Scene_Dialogue"] = repr(["A brand new line.", "And another."])
+    second.loc[4, "Scene_Characters"] = repr(["CHARACTER 0", "NEWCOMER"])
+    second.loc[9, "Scene_Names"] = "INT. SOMEWHERE ELSE  NIGHT"
+    second = pd.concat([second.drop(index=[20, 21]), second.loc[[30]]], ignore_index=True)
+    third = second.drop(index=range(0, 10)).reset_index(drop=True)
+    return [first, second, third, first]
+
+
+def assert_matches_full_recompute(tracker, corpus):
+    expected = character_statistics(corpus).set_index("Character")[["Scenes", "Lines", "Words"]].sort_index()
+    table = tracker.character_table().set_index("Character")
+    pd.testing.assert_frame_equal(table[["Scenes", "Lines", "Words"]].sort_index(), expected, check_dtype=False)
+
+    compound = fake_sentiment(corpus.line_text)
+    totals = np.bincount(corpus.line_speaker, weights=compound, minlength=corpus.n_characters)
+    lines = np.bincount(corpus.line_speaker, minlength=corpus.n_characters)
+    sentiment = pd.Series(totals / lines, index=corpus.characters).sort_index()
+    np.testing.assert_allclose(table["Sentiment"].sort_index(), sentiment, atol=1e-6)
+
+    for weight in RELATIONSHIP_WEIGHTS:
+        def pairs(edges):
+            return {(tuple(sorted((a, b))), int(w)) for a, b, w in edges.itertuples(index=False)}
+        assert pairs(tracker.edges(weight)) == pairs(top_edges(corpus, weight=weight)), weight
+
+
+def test_incremental_totals_match_full_recompute():
+    tracker = revisions.RevisionTracker()
+    for number, df in enumerate(drafts()):
+        corpus = ScriptCorpus.from_frame(df, key=f"draft {number}")
+        tracker.update(corpus)
+        assert_matches_full_recompute(tracker, corpus)
+
+
+def test_diff_reports_changed_scenes_and_characters():
+    first, second = drafts()[:2]
+    tracker = revisions.RevisionTracker()
+    baseline = tracker.update(ScriptCorpus.from_frame(first, key="first"))
+    assert (baseline.added, baseline.removed, baseline.unchanged) == (60, 0, 0)
+    assert baseline.moved.empty
+
+    diff = tracker.update(ScriptCorpus.from_frame(second, key="second"))
+    # Edited and renamed scenes count as one removed and one added scene each; the repeat adds one more
+    assert (diff.added, diff.removed, diff.unchanged) == (3, 4, 56)
+    assert "NEWCOMER" in diff.changed_characters
+    moved = diff.moved.set_index(["Character", "Metric"])
+    assert pd.isna(moved.loc[("NEWCOMER", "Lines"), "Before"])
+    assert moved.loc[("NEWCOMER", "Lines"), "After"] == 1
+
+
+def test_whitespace_edits_keep_the_fingerprint():
+    assert revisions.scene_fingerprint("INT. BAR  NIGHT", ["A"], ["Hello  there"]) == \
+        revisions.scene_fingerprint("INT. BAR NIGHT ", ["A"], [" Hello there"])
+    assert revisions.scene_fingerprint("INT. BAR", ["A"], ["Hi"]) != revisions.scene_fingerprint("INT. BAR", ["B"], ["Hi"])
+
+
+def test_failed_scoring_leaves_the_totals_untouched(monkeypatch):
+    first, second = drafts()[:2]
+    tracker = revisions.RevisionTracker()
+    tracker.update(ScriptCorpus.from_frame(first, key="first"))
+    revised = ScriptCorpus.from_frame(second, key="second")
+
+    def broken(texts, store=None):
+        raise OSError("emotion model is not provisioned")
+
+    monkeypatch.setattr(revisions, "score_sentiment", broken)
+    with pytest.raises(OSError):
+        tracker.update(revised)
+    assert tracker.key == "first"
+    assert_matches_full_recompute(tracker, ScriptCorpus.from_frame(first, key="first"))
+
+    # Once scoring works again the same draft applies exactly once
+    monkeypatch.setattr(revisions, "score_sentiment", fake_sentiment)
+    tracker.update(revised)
+    assert_matches_full_recompute(tracker, revised)
@@ -0,0 +1,72 @@
+import io
+import os
+
+import pytest
+
+from corpus import ScriptCorpus, read_screenplay_csv
+from screenplay_parser import clean_heading, main, parse_screenplay, speaker_from_cue, write_screenplay_csv
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "sample_script.txt")
+
+
+def parse_fixture():
+    with open(FIXTURE, encoding="utf-8") as handle:
+        return list(parse_screenplay(handle))
+
+
+def test_scene_headings_and_page_noise():
+    records = parse_fixture()
+    assert [record.heading for record in records] == [
+        "EXT. FREEWAY OVERPASS DAY",
+        "INT. TAXI CAB CONTINUOUS",
+        "INT. APARTMENT NIGHT",
+    ]
+    # Title page, draft headers, page counters and (MORE) never reach a scene
+    assert not any("Shooting Script" in record.contents or "Page 2" in record.contents for record in records)
+
+
+def test_cues_dialogue_and_action():
+    first, second, third = parse_fixture()
+    assert first.speakers == ["DEADPOOL"]
+    assert first.dialogue == ["Can I get some fries with that shake?"]
+    # A lone uppercase line followed by a blank is action, and transitions are dropped from it
+    assert "BOOM!" in first.action
+    assert "CUT TO:" not in first.action
+    assert second.speakers == ["DOPINDER", "DEADPOOL", "DR. KILLEBREW"]
+    assert second.dialogue == ["Where to, sir?", "Anywhere with tacos.", "You can't outrun me."]
+    assert third.speakers == [] and third.action == "Empty room."
+
+
+def test_csv_round_trip():
+    records = parse_fixture()
+    handle = io.StringIO()
+    assert write_screenplay_csv(records, handle) == len(records)
+    corpus = ScriptCorpus.from_frame(read_screenplay_csv(handle.getvalue().encode("utf-8")))
+
+    assert list(corpus.scene_names) == [record.heading for record in records]
+    assert list(corpus.scene_actions) == [record.action for record in records]
+    for scene, record in enumerate(records):
+        lines = corpus.scene_lines(scene)
+        assert [corpus.characters[speaker] for speaker in corpus.line_speaker[lines]] == record.speakers
+        assert list(corpus.line_text[lines]) == record.dialogue
+
+
+def test_cue_heuristics():
+    assert speaker_from_cue("DR. KILLEBREW (V.O.)") == "DR. KILLEBREW"
+    assert speaker_from_cue("WADE (CONT'D)") == "WADE"
+    assert speaker_from_cue("CUT TO:") is None
+    assert speaker_from_cue("INT. BAR - NIGHT") is None
+    assert speaker_from_cue("Deadpool waves.") is None
+    assert clean_heading("EXT. FREEWAY - DAY    12A") == "EXT. FREEWAY DAY"
+
+
+def test_stdout_rejects_several_scripts(tmp_path, capsys):
+    with open(FIXTURE, encoding="utf-8") as handle:
+        script = handle.read()
+    for name in ("one.txt", "two.txt"):
+        (tmp_path / name).write_text(script, encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main([str(tmp_path)])
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "2 scripts matched" in captured.err